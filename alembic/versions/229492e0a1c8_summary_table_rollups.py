@@ -0,0 +1,56 @@
+"""summary table rollups
+
+Revision ID: 229492e0a1c8
+Revises: 71d663598bab
+Create Date: 2026-10-18 10:30:42.317004
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '229492e0a1c8'
+down_revision: Union[str, None] = '71d663598bab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# materialized views of transactions summed by month and these columns.
+ROLLUPS = {
+    'rollup_ym': (),
+    'rollup_atc': ('assistance_type_code',),
+    'rollup_ppopst': ('primary_place_of_performance_state_name',),
+    'rollup_awag': ('awarding_agency_code', 'awarding_agency_name'),
+    'rollup_awag_cfda': (
+        'awarding_agency_code', 'awarding_agency_name', 'cfda_number', 'cfda_title',
+    ),
+    'rollup_awag_psc': (
+        'awarding_agency_code', 'awarding_agency_name',
+        'product_or_service_code', 'product_or_service_code_description',
+    ),
+    'rollup_awag_naics': (
+        'awarding_agency_code', 'awarding_agency_name', 'naics_code', 'naics_description',
+    ),
+    'rollup_awag_naics_ppopct': (
+        'awarding_agency_code', 'awarding_agency_name', 'naics_code', 'naics_description',
+        'prime_award_transaction_place_of_performance_county_fips_code',
+    ),
+}
+
+
+def upgrade() -> None:
+    for name, dims in ROLLUPS.items():
+        cols = ', '.join(('action_date_year', 'action_date_year_month') + dims)
+        op.execute(
+            f'CREATE MATERIALIZED VIEW {name} AS SELECT {cols}, '
+            'sum(generated_pragmatic_obligations) AS sum_spending '
+            f'FROM transactions GROUP BY {cols}'
+        )
+        op.execute(f'CREATE UNIQUE INDEX ux_{name} ON {name} ({cols}) NULLS NOT DISTINCT')
+
+
+def downgrade() -> None:
+    for name in ROLLUPS:
+        op.execute(f'DROP MATERIALIZED VIEW {name}')
@@ -0,0 +1,98 @@
+"""partition transactions by action date year
+
+Revision ID: 4ca088906a9e
+Revises: b35302476689
+Create Date: 2026-10-18 10:17:03.801812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ca088906a9e'
+down_revision: Union[str, None] = 'b35302476689'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+from datetime import date
+
+TABLES = ('assistance_transactions', 'procurement_transactions', 'transactions')
+INDEXES = {
+    'transactions': (
+        ('ix_transactions_assistance_transaction_unique_key', 'assistance_transaction_unique_key'),
+        ('ix_transactions_contract_transaction_unique_key', 'contract_transaction_unique_key'),
+    ),
+}
+# USAs prime award data starts in fiscal year 2001. Later years are created by
+# the seed scripts as data is loaded.
+FIRST_YEAR = 2000
+
+
+def _copy_table(table: str, partitioned: bool) -> None:
+    """Recreate table, partitioned by year of action_date or not, keeping its
+    rows, id sequence and indexes.
+
+    Raises RuntimeError if table has rows without an action_date, which no
+    partition can hold, rather than dropping them."""
+    conn = op.get_bind()
+    if partitioned:
+        missing = conn.execute(sa.text(
+            f'SELECT count(*) FROM {table} WHERE action_date IS NULL'
+        )).scalar_one()
+        if missing:
+            raise RuntimeError(
+                f'{table} has {missing} rows without an action_date, which cannot '
+                'be partitioned. Fix or delete them, then run the migration again.'
+            )
+    old = f'{table}_migrating'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} DROP CONSTRAINT {table}_pkey')
+    for name, _ in INDEXES.get(table, ()):
+        op.drop_index(name, table_name=old)
+
+    partition_by = ' PARTITION BY RANGE (action_date)' if partitioned else ''
+    op.execute(
+        f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED '
+        f'INCLUDING STORAGE){partition_by}'
+    )
+    if partitioned:
+        op.alter_column(table, 'action_date', nullable=False)
+        op.create_primary_key(f'{table}_pkey', table, ['action_date', 'id'])
+        years = set(range(FIRST_YEAR, date.today().year + 2))
+        years.update(
+            int(y) for y in conn.execute(sa.text(
+                f'SELECT DISTINCT EXTRACT(year FROM action_date) FROM {old} '
+                'WHERE action_date IS NOT NULL'
+            )).scalars()
+        )
+        for year in sorted(years):
+            op.execute(
+                f'CREATE TABLE {table}_y{year} PARTITION OF {table} '
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+    else:
+        op.alter_column(table, 'action_date', nullable=True)
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+
+    cols = ', '.join(conn.execute(sa.text(
+        'SELECT column_name FROM information_schema.columns '
+        "WHERE table_name = :table AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    ), dict(table=old)).scalars())
+    op.execute(f'INSERT INTO {table} ({cols}) SELECT {cols} FROM {old}')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.drop_table(old)
+    for name, col in INDEXES.get(table, ()):
+        op.create_index(name, table, [col], unique=False)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        _copy_table(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        _copy_table(table, partitioned=False)
@@ -0,0 +1,43 @@
+"""summary table covering indexes
+
+Revision ID: 6822b0a4c0c6
+Revises: 010cb6a338e0
+Create Date: 2026-10-18 10:53:18.143847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6822b0a4c0c6'
+down_revision: Union[str, None] = '010cb6a338e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# summary table filter indexes by key column and the group by column INCLUDEd
+# with it, see models.Transactions.
+INDEXES = [
+    ('ix_transactions_awag', 'awarding_agency_code', ['awarding_agency_name']),
+    ('ix_transactions_awid', 'award_summary_unique_key', []),
+    ('ix_transactions_cfda', 'cfda_number', ['cfda_title']),
+    ('ix_transactions_naics', 'naics_code', ['naics_description']),
+    ('ix_transactions_ppopct', 'prime_award_transaction_place_of_performance_county_fips_code', []),
+    ('ix_transactions_psc', 'product_or_service_code', ['product_or_service_code_description']),
+    ('ix_transactions_uei', 'recipient_uei', ['recipient_name']),
+]
+DATE_COLUMNS = ['action_date', 'action_date_year', 'action_date_year_month']
+
+
+def upgrade() -> None:
+    for name, col, include in INDEXES:
+        op.drop_index(name, table_name='transactions')
+        op.create_index(name, 'transactions', [col], unique=False, postgresql_include=[*include, *DATE_COLUMNS, 'generated_pragmatic_obligations'])
+
+
+def downgrade() -> None:
+    for name, col, include in INDEXES:
+        op.drop_index(name, table_name='transactions')
+        op.create_index(name, 'transactions', [col], unique=False, postgresql_include=['generated_pragmatic_obligations'])
@@ -0,0 +1,67 @@
+"""generated derived columns
+
+Revision ID: be7e129dd216
+Revises: 7a8020aaf2b2
+Create Date: 2026-10-18 10:12:09.869258
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'be7e129dd216'
+down_revision: Union[str, None] = '7a8020aaf2b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTION_DATE_YEAR_SQL = "CAST(EXTRACT(year FROM action_date) AS INTEGER)"
+ACTION_DATE_YEAR_MONTH_SQL = (
+    "lpad(CAST(EXTRACT(year FROM action_date) AS INTEGER)::text, 4, '0') || '-' "
+    "|| lpad(CAST(EXTRACT(month FROM action_date) AS INTEGER)::text, 2, '0')"
+)
+DERIVATIONS = {
+    'assistance_transactions': {
+        'generated_pragmatic_obligations': "CASE WHEN assistance_type_code IN ('07', '08') "
+        "THEN coalesce(original_loan_subsidy_cost, federal_action_obligation, 0.0) "
+        "ELSE coalesce(federal_action_obligation, 0.0) END",
+        'award_summary_unique_key': 'assistance_award_unique_key',
+    },
+    'procurement_transactions': {
+        'generated_pragmatic_obligations': 'coalesce(federal_action_obligation, 0.0)',
+        'award_summary_unique_key': 'contract_award_unique_key',
+    },
+}
+COLUMN_TYPES = {
+    'generated_pragmatic_obligations': sa.Float(),
+    'action_date_year_month': sa.String(),
+    'action_date_year': sa.Integer(),
+    'award_summary_unique_key': sa.String(),
+}
+
+
+def upgrade() -> None:
+    # postgres cannot turn an existing column into a generated one, so the
+    # derived columns are recreated. Each table is rewritten once.
+    for table, derivations in DERIVATIONS.items():
+        exprs = dict(
+            derivations,
+            action_date_year_month=ACTION_DATE_YEAR_MONTH_SQL,
+            action_date_year=ACTION_DATE_YEAR_SQL,
+        )
+        for col in COLUMN_TYPES:
+            op.drop_column(table, col)
+        for col, type_ in COLUMN_TYPES.items():
+            op.add_column(
+                table,
+                sa.Column(col, type_, sa.Computed(exprs[col], persisted=True), nullable=True),
+            )
+
+
+def downgrade() -> None:
+    # keeps the generated values as plain column values.
+    for table in DERIVATIONS:
+        for col in COLUMN_TYPES:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN {col} DROP EXPRESSION')
@@ -1,8 +1,9 @@
 from sqlalchemy import create_engine, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 import os
 from dotenv import load_dotenv
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 load_dotenv()
 
@@ -23,6 +24,14 @@ url_object: URL = URL.create(
 engine = create_engine(url_object, echo=True)
 sess = sessionmaker(bind=engine)
 
+# used by the API so queries do not block the event loop. Loaders and
+# migrations use engine.
+async_url_object: URL = url_object.set(
+    drivername=os.environ.get("ASYNC_DB_DRIVER", "postgresql+asyncpg")
+)
+async_engine = create_async_engine(async_url_object, echo=True)
+async_sess = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     db: Session = sess()
@@ -30,3 +39,8 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_sess() as db:
+        yield db
@@ -0,0 +1,64 @@
+from awardsreport.models import DataVersion, SummaryTableCacheEntry
+from sqlalchemy import Connection, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+# data served by the API: transactions and the rollups built from it.
+TRANSACTIONS = "transactions"
+# NOTIFY channel announcing new versions, payload '<name>:<version>'.
+CHANNEL = "data_version"
+
+
+def get_data_version(conn: Connection | Session, name: str = TRANSACTIONS) -> int:
+    """Get the current version of a data set.
+
+    params
+        conn: Connection | Session
+        name: str data set name.
+
+    return int version, 0 if the data set never changed.
+    """
+    version = conn.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_data_version(conn: Connection, name: str = TRANSACTIONS) -> int:
+    """Record that a data set changed.
+
+    Execute in the transaction that changes the data, so readers never see
+    the new version with the old data. Listeners on CHANNEL are notified when
+    the transaction commits, and shared summary table responses built from
+    older transactions versions are deleted.
+
+    params
+        conn: Connection
+        name: str data set name.
+
+    return int new version.
+    """
+    stmt = insert(DataVersion).values(name=name, version=1)
+    version = conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DataVersion.name],
+            set_=dict(version=DataVersion.version + 1, updated_at=func.now()),
+        ).returning(DataVersion.version)
+    ).scalar_one()
+    if name == TRANSACTIONS:
+        conn.execute(
+            delete(SummaryTableCacheEntry).where(
+                SummaryTableCacheEntry.data_version < version
+            )
+        )
+    conn.execute(select(func.pg_notify(CHANNEL, f"{name}:{version}")))
+    return version
+
+
+def parse_notification(payload: str) -> tuple[str, int]:
+    """Split a CHANNEL notification payload.
+
+    return tuple[str, int] data set name and its new version.
+    """
+    name, _, version = payload.rpartition(":")
+    return name, int(version)
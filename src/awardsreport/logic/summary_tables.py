@@ -1,8 +1,23 @@
 from awardsreport import log_config
 from awardsreport.models import Transactions as T
 from awardsreport.schemas import summary_tables_schemas
+from dataclasses import dataclass
 from fastapi import Depends
-from sqlalchemy import select, func, desc, Select, and_, true, Column, Float
+from datetime import date, timedelta
+from sqlalchemy import (
+    select,
+    func,
+    desc,
+    Select,
+    and_,
+    or_,
+    true,
+    false,
+    Column,
+    Float,
+    MetaData,
+    Table,
+)
 from sqlalchemy.orm import InstrumentedAttribute
 from typing import Any, Annotated, get_args, Optional, TypedDict
 import logging.config
@@ -11,26 +26,28 @@ logging.config.dictConfig(log_config.LOGGING_CONFIG)
 logger = logging.getLogger("awardsreport")
 
 
+# date range with both ends included.
+DateRange = tuple[date, date]
+
 # keys represent filter key passed to summary_tables.
-# values represent lambda functions to filter using parameter values.
-filter_key_op = {
-    "atc": lambda v: T.assistance_type_code.in_(v),
-    "awag": lambda v: T.awarding_agency_code.in_(v),
-    "awid": lambda v: T.award_summary_unique_key.in_(v),
-    "cfda": lambda v: T.cfda_number.in_(v),
-    "end_date": lambda v: (T.action_date <= v),
-    "naics": lambda v: T.naics_code.in_(v),
-    "ppopst": lambda v: T.primary_place_of_performance_state_name.in_(v),
-    "ppopct": lambda v: T.prime_award_transaction_place_of_performance_county_fips_code.in_(
-        v
-    ),
-    "psc": lambda v: T.product_or_service_code.in_(v),
-    "start_date": lambda v: (T.action_date >= v),
-    "uei": lambda v: T.recipient_uei.in_(v),
-    "y": lambda v: T.action_date_year.in_(v),
-    "ym": lambda v: T.action_date_year_month.in_(v),
+# values represent the column filtered by parameter values.
+filter_key_col = {
+    "atc": T.assistance_type_code,
+    "awag": T.awarding_agency_code,
+    "awid": T.award_summary_unique_key,
+    "cfda": T.cfda_number,
+    "naics": T.naics_code,
+    "ppopst": T.primary_place_of_performance_state_name,
+    "ppopct": T.prime_award_transaction_place_of_performance_county_fips_code,
+    "psc": T.product_or_service_code,
+    "uei": T.recipient_uei,
 }
 
+# keys represent filter key passed to summary_tables.
+# values represent lambda functions to filter using parameter values.
+# start_date, end_date, y and ym are combined by create_action_date_filter.
+filter_key_op = {key: col.in_ for key, col in filter_key_col.items()}
+
 # keys represent filter key passed to summary_tables.
 # values represent lambda functions to filter using parameter values.
 group_by_key_col = {
@@ -48,6 +65,55 @@ group_by_key_col = {
 }
 
 
+@dataclass(frozen=True)
+class Rollup:
+    """Materialized view of transactions summed by month and keys.
+
+    A rollup can answer summary table requests that only group by and filter
+    on its keys, y and ym. See create_rollup_select for its columns.
+    """
+
+    name: str
+    keys: tuple[str, ...]
+
+    @property
+    def columns(self) -> list[InstrumentedAttribute]:
+        """Transactions columns the rollup groups by."""
+        cols = [T.action_date_year, T.action_date_year_month]
+        for key in self.keys:
+            for col in (filter_key_col.get(key), group_by_key_col.get(key)):
+                if col is not None and col not in cols:
+                    cols.append(col)
+        return cols
+
+
+# most used summaries, smallest first. select_rollup picks the first one that
+# covers a request.
+ROLLUPS = [
+    Rollup("rollup_ym", ()),
+    Rollup("rollup_atc", ("atc",)),
+    Rollup("rollup_ppopst", ("ppopst",)),
+    Rollup("rollup_awag", ("awag",)),
+    Rollup("rollup_awag_cfda", ("awag", "cfda")),
+    Rollup("rollup_awag_psc", ("awag", "psc")),
+    Rollup("rollup_awag_naics", ("awag", "naics")),
+    Rollup("rollup_awag_naics_ppopct", ("awag", "naics", "ppopct")),
+]
+
+# rollups are materialized views, kept out of Base.metadata so alembic does
+# not manage them as tables.
+rollup_metadata = MetaData()
+rollup_tables = {
+    rollup.name: Table(
+        rollup.name,
+        rollup_metadata,
+        *[Column(col.key, col.type) for col in rollup.columns],
+        Column("sum_spending", Float),
+    )
+    for rollup in ROLLUPS
+}
+
+
 def create_group_by_col_list(
     schema: summary_tables_schemas.GroupByStatementSchema,
 ) -> list[InstrumentedAttribute]:
@@ -67,6 +133,117 @@ def create_group_by_col_list(
     return group_by_col_list
 
 
+def merge_date_ranges(ranges: list[DateRange]) -> list[DateRange]:
+    """Merge overlapping and adjacent date ranges.
+
+    params
+        ranges: list[DateRange] in any order.
+
+    return list[DateRange] sorted, non-overlapping ranges covering the same
+    dates.
+    """
+    merged: list[DateRange] = []
+    for start, end in sorted(ranges):
+        # subtract rather than add a day, the last end may be date.max.
+        if merged and (start - merged[-1][1]).days <= 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_date_ranges(a: list[DateRange], b: list[DateRange]) -> list[DateRange]:
+    """Get the dates in both a and b.
+
+    params
+        a: list[DateRange] merged ranges, see merge_date_ranges.
+        b: list[DateRange] merged ranges, see merge_date_ranges.
+
+    return list[DateRange] merged ranges of dates in both a and b.
+    """
+    return merge_date_ranges(
+        [
+            (max(a_start, b_start), min(a_end, b_end))
+            for a_start, a_end in a
+            for b_start, b_end in b
+            if max(a_start, b_start) <= min(a_end, b_end)
+        ]
+    )
+
+
+def year_ranges(years: list[int]) -> list[DateRange]:
+    return merge_date_ranges([(date(y, 1, 1), date(y, 12, 31)) for y in years])
+
+
+def year_month_ranges(year_months: list[str]) -> list[DateRange]:
+    """Convert 'YYYY-MM' values to merged date ranges."""
+    ranges = []
+    for ym in year_months:
+        y, m = int(ym[:4]), int(ym[5:])
+        end = (
+            date.max
+            if (y, m) == (date.max.year, 12)
+            else date(y + (m == 12), m % 12 + 1, 1) - timedelta(days=1)
+        )
+        ranges.append((date(y, m, 1), end))
+    return merge_date_ranges(ranges)
+
+
+def get_action_date_ranges(
+    schema: summary_tables_schemas.FilterStatementSchema,
+) -> Optional[list[DateRange]]:
+    """Combine start_date, end_date, y and ym into action_date ranges.
+
+    params
+        schema: summary_tables_schemas.FilterStatementSchema
+
+    return Optional[list[DateRange]] merged ranges of action_dates to keep,
+    None if no date filter was given.
+    """
+    if not (schema.y or schema.ym or schema.start_date or schema.end_date):
+        return None
+    ranges = [(date.min, date.max)]
+    if schema.y:
+        ranges = intersect_date_ranges(ranges, year_ranges(schema.y))
+    if schema.ym:
+        ranges = intersect_date_ranges(ranges, year_month_ranges(schema.ym))
+    bounds = (
+        date.fromisoformat(schema.start_date) if schema.start_date else date.min,
+        date.fromisoformat(schema.end_date) if schema.end_date else date.max,
+    )
+    return intersect_date_ranges(ranges, [bounds])
+
+
+def create_action_date_filter(
+    schema: summary_tables_schemas.FilterStatementSchema,
+) -> Optional[Any]:
+    """Combine start_date, end_date, y and ym into an action_date filter.
+
+    y and ym are rewritten into as few action_date BETWEEN ranges as possible
+    and intersected with start_date and end_date, so the filter can use
+    action_date indexes and partition pruning.
+
+    params
+        schema: summary_tables_schemas.FilterStatementSchema
+
+    return Optional[Any] filter on action_date, None if no date filter was
+    given.
+    """
+    if not schema.y and not schema.ym:
+        date_filters = []
+        if schema.start_date:
+            date_filters.append(T.action_date >= schema.start_date)
+        if schema.end_date:
+            date_filters.append(T.action_date <= schema.end_date)
+        return and_(*date_filters) if date_filters else None
+
+    ranges = get_action_date_ranges(schema) or []
+    if not ranges:
+        return false()
+    between = [T.action_date.between(start, end) for start, end in ranges]
+    return between[0] if len(between) == 1 else or_(*between)
+
+
 def create_filter_statement(
     schema: Annotated[summary_tables_schemas.FilterStatementSchema, Depends()],
 ) -> Any:
@@ -86,6 +263,9 @@ def create_filter_statement(
             if value:
                 filter_statement = filter_key_op[key](value)
                 filter_statement_list.append(filter_statement)
+    action_date_filter = create_action_date_filter(schema)
+    if action_date_filter is not None:
+        filter_statement_list.append(action_date_filter)
     # filter by sqlalchemy.true to avoid deprecation warning
     return and_(true, *filter_statement_list)
 
@@ -114,7 +294,7 @@ def create_group_by_sum_filter_limit_statement(
             *group_by_col_list,
             func.coalesce(func.sum(T.generated_pragmatic_obligations), 0.0)
             .cast(Float)
-            .label("sum_spending")
+            .label("sum_spending"),
         )
         .group_by(*group_by_col_list)
         .where(and_(*[col.isnot(None) for col in group_by_col_list]))
@@ -123,3 +303,133 @@ def create_group_by_sum_filter_limit_statement(
         .order_by(desc("sum_spending"))
     )
     return stmt
+
+
+def create_rollup_select(rollup: Rollup) -> Select:
+    """Create the query a rollup materialized view is defined by.
+
+    params
+        rollup: Rollup
+
+    return Select transactions summed by rollup.columns, with the sum labeled
+    sum_spending.
+    """
+    return select(
+        *rollup.columns,
+        func.sum(T.generated_pragmatic_obligations).label("sum_spending"),
+    ).group_by(*rollup.columns)
+
+
+def is_month_aligned(ranges: list[DateRange]) -> bool:
+    """Check each range starts on the first and ends on the last of a month."""
+    return all(
+        start.day == 1 and (end == date.max or (end + timedelta(days=1)).day == 1)
+        for start, end in ranges
+    )
+
+
+def select_rollup(
+    group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+    filter_schema: summary_tables_schemas.FilterStatementSchema,
+) -> Optional[Rollup]:
+    """Pick the smallest rollup that can answer a summary table request.
+
+    A rollup covers a request if it has every gb and filter key, y and ym
+    aside, and any date filter selects whole months.
+
+    params
+        group_by_schema: summary_tables_schemas.GroupByStatementSchema
+        filter_schema: summary_tables_schemas.FilterStatementSchema
+
+    return Optional[Rollup] None if no rollup covers the request.
+    """
+    keys = {key for key in group_by_schema.gb if key not in ("y", "ym")}
+    keys.update(key for key in filter_key_col if filter_schema[key])
+    ranges = get_action_date_ranges(filter_schema)
+    if ranges is not None and not is_month_aligned(ranges):
+        return None
+    for rollup in ROLLUPS:
+        if keys <= set(rollup.keys):
+            return rollup
+    return None
+
+
+def create_rollup_statement(
+    rollup: Rollup,
+    group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+    filter_schema: summary_tables_schemas.FilterStatementSchema,
+    limit_schema: summary_tables_schemas.LimitStatementSchema,
+) -> Select:
+    """Create the rollup equivalent of create_group_by_sum_filter_limit_statement.
+
+    params
+        rollup: Rollup covering the request, see select_rollup.
+        group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+        filter_schema: summary_tables_schemas.FilterStatementSchema,
+        limit_schema: summary_tables_schemas.LimitStatementSchema,
+
+    return Select
+    """
+    r = rollup_tables[rollup.name]
+    group_by_col_list = [
+        r.c[col.key] for col in create_group_by_col_list(group_by_schema)
+    ]
+    filter_statement_list = [
+        r.c[filter_key_col[key].key].in_(filter_schema[key])
+        for key in filter_key_col
+        if filter_schema[key]
+    ]
+    ranges = get_action_date_ranges(filter_schema)
+    if ranges is not None:
+        # ranges are whole months, so they can be compared as 'YYYY-MM'.
+        filter_statement_list.append(
+            or_(
+                false(),
+                *[
+                    r.c.action_date_year_month.between(
+                        f"{start.year:04d}-{start.month:02d}",
+                        f"{end.year:04d}-{end.month:02d}",
+                    )
+                    for start, end in ranges
+                ],
+            )
+        )
+
+    return (
+        select(
+            *group_by_col_list,
+            func.coalesce(func.sum(r.c.sum_spending), 0.0)
+            .cast(Float)
+            .label("sum_spending"),
+        )
+        .group_by(*group_by_col_list)
+        .where(and_(*[col.isnot(None) for col in group_by_col_list]))
+        .where(and_(true(), *filter_statement_list))
+        .limit(limit_schema.limit)
+        .order_by(desc("sum_spending"))
+    )
+
+
+def create_summary_table_statement(
+    group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+    filter_schema: summary_tables_schemas.FilterStatementSchema,
+    limit_schema: summary_tables_schemas.LimitStatementSchema,
+) -> Select:
+    """Create a summary table query, reading a rollup when one covers it.
+
+    Falls back to create_group_by_sum_filter_limit_statement on transactions.
+
+    params
+        group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+        filter_schema: summary_tables_schemas.FilterStatementSchema,
+        limit_schema: summary_tables_schemas.LimitStatementSchema,
+
+    return Select
+    """
+    rollup = select_rollup(group_by_schema, filter_schema)
+    if rollup is None:
+        return create_group_by_sum_filter_limit_statement(
+            group_by_schema, filter_schema, limit_schema
+        )
+    logger.debug(f"summary table read from {rollup.name}")
+    return create_rollup_statement(rollup, group_by_schema, filter_schema, limit_schema)
@@ -2,10 +2,15 @@ import os
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 
+from awardsreport.database import async_engine
 from awardsreport.routers import summary_tables
 from awardsreport.logging_setup import setup_logging
+from awardsreport.services.data_version_listener import DataVersionListener
 
 load_dotenv()
 
@@ -14,6 +19,46 @@ setup_logging()
 app = FastAPI()
 app.include_router(summary_tables.router)
 
+
+@app.exception_handler(ValidationError)
+async def schema_validation_exception_handler(request: Request, exc: ValidationError):
+    """Respond 422 when a query parameter schema rejects the request.
+
+    FastAPI only turns its own parameter checks into 422s. Validators of the
+    schemas used as dependencies raise while the dependency is built, and
+    would otherwise respond 500. Other validation errors, e.g. of responses,
+    still respond 500.
+    """
+    if exc.model not in summary_tables.REQUEST_SCHEMAS:
+        raise exc
+    return await request_validation_exception_handler(
+        request, RequestValidationError(exc.raw_errors)
+    )
+
+
+# clears the summary table cache as soon as loaders commit new data.
+listener: DataVersionListener | None = None
+
+
+@app.on_event("startup")
+def start_listener():
+    global listener
+    listener = DataVersionListener(summary_tables.cache.set_version)
+    listener.start()
+
+
+@app.on_event("shutdown")
+def stop_listener():
+    if listener is not None:
+        listener.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    # pooled asyncpg connections belong to this event loop.
+    await async_engine.dispose()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "awardsreport.main:app",
@@ -1,7 +1,8 @@
-from sqlalchemy import String
+from sqlalchemy import BigInteger, Computed, Index, String, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import mapped_column, Mapped
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 
 from awardsreport.database import Base
 
@@ -11,9 +12,12 @@ class HasId:
 
 
 class TransactionsMixin:
-    action_date: Mapped[Optional[date]] = mapped_column(
+    action_date: Mapped[date] = mapped_column(
+        primary_key=True,
         doc="""The date the action being reported was issued / signed by the
-        Government or a binding agreement was reached."""
+        Government or a binding agreement was reached. Transaction tables are
+        partitioned by year of action_date, so it is part of the primary
+        key.""",
     )
     awarding_agency_code: Mapped[Optional[str]] = mapped_column(
         doc="""Code for agency which made the award. See
@@ -636,14 +640,71 @@ class TransactionDerivationsMixin:
     )
 
 
+# generated column expressions must be immutable, so to_char is not allowed.
+ACTION_DATE_YEAR_SQL = "CAST(EXTRACT(year FROM action_date) AS INTEGER)"
+ACTION_DATE_YEAR_MONTH_SQL = (
+    "lpad(CAST(EXTRACT(year FROM action_date) AS INTEGER)::text, 4, '0') || '-' "
+    "|| lpad(CAST(EXTRACT(month FROM action_date) AS INTEGER)::text, 2, '0')"
+)
+
+
+class GeneratedActionDateMixin:
+    """Derived action_date columns computed by the database as rows are
+    written."""
+
+    action_date_year_month: Mapped[Optional[str]] = mapped_column(
+        Computed(ACTION_DATE_YEAR_MONTH_SQL, persisted=True),
+        doc="""'YYYY-MM' from `action_date`""",
+    )
+    action_date_year: Mapped[Optional[int]] = mapped_column(
+        Computed(ACTION_DATE_YEAR_SQL, persisted=True),
+        doc="""Year of `transaction.action_date`""",
+    )
+
+
+class AssistanceTransactionDerivationsMixin(GeneratedActionDateMixin):
+    generated_pragmatic_obligations: Mapped[Optional[float]] = mapped_column(
+        Computed(
+            "CASE WHEN assistance_type_code IN ('07', '08') "
+            "THEN coalesce(original_loan_subsidy_cost, federal_action_obligation, 0.0) "
+            "ELSE coalesce(federal_action_obligation, 0.0) END",
+            persisted=True,
+        ),
+        doc="""original_loan_subsidy_cost for loans (assistance_type_code =
+        '07', '08'), otherwise federal_action_obligation. 0.0 when NULL.""",
+    )
+    award_summary_unique_key: Mapped[Optional[str]] = mapped_column(
+        Computed("assistance_award_unique_key", persisted=True),
+        doc="""assistance_award_unique_key""",
+    )
+
+
+class ProcurementTransactionDerivationsMixin(GeneratedActionDateMixin):
+    generated_pragmatic_obligations: Mapped[Optional[float]] = mapped_column(
+        Computed("coalesce(federal_action_obligation, 0.0)", persisted=True),
+        doc="""federal_action_obligation, 0.0 when NULL.""",
+    )
+    award_summary_unique_key: Mapped[Optional[str]] = mapped_column(
+        Computed("contract_award_unique_key", persisted=True),
+        doc="""contract_award_unique_key""",
+    )
+
+
 class AssistanceTransactions(
     Base,
     TransactionsMixin,
     AssistanceTransactionsMixin,
     HasId,
-    TransactionDerivationsMixin,  # must be inhereted last
+    AssistanceTransactionDerivationsMixin,  # must be inhereted last
 ):
     __tablename__ = "assistance_transactions"
+    __table_args__ = (
+        Index(
+            "ix_assistance_transactions_assistance_transaction_unique_key",
+            "assistance_transaction_unique_key",
+        ),
+        {"postgresql_partition_by": "RANGE (action_date)"},
+    )
 
 
 class ProcurementTransactions(
@@ -651,9 +712,16 @@ class ProcurementTransactions(
     TransactionsMixin,
     ProcurementTransactionsMixin,
     HasId,
-    TransactionDerivationsMixin,  # must be inhereted last
+    ProcurementTransactionDerivationsMixin,  # must be inhereted last
 ):
     __tablename__ = "procurement_transactions"
+    __table_args__ = (
+        Index(
+            "ix_procurement_transactions_contract_transaction_unique_key",
+            "contract_transaction_unique_key",
+        ),
+        {"postgresql_partition_by": "RANGE (action_date)"},
+    )
 
 
 class Transactions(
@@ -665,3 +733,154 @@ class Transactions(
     HasId,
 ):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index(
+            "ix_transactions_assistance_transaction_unique_key",
+            "assistance_transaction_unique_key",
+        ),
+        Index(
+            "ix_transactions_contract_transaction_unique_key",
+            "contract_transaction_unique_key",
+        ),
+        # summary_tables filters. action_date follows the load order, so a
+        # BRIN index stays tiny. The code filters INCLUDE the summed column,
+        # the column grouped by for the same key and the date columns, so a
+        # request filtering by a key and grouping by that key, y or ym, with
+        # any date filter, is answered by an index-only scan. Filtering by one
+        # key and grouping by another reads the matching rows from the table.
+        Index(
+            "ix_transactions_action_date_brin", "action_date", postgresql_using="brin"
+        ),
+        *[
+            Index(
+                f"ix_transactions_{key}",
+                col,
+                postgresql_include=[
+                    *include,
+                    "action_date",
+                    "action_date_year",
+                    "action_date_year_month",
+                    "generated_pragmatic_obligations",
+                ],
+            )
+            for key, col, include in (
+                ("awag", "awarding_agency_code", ["awarding_agency_name"]),
+                ("awid", "award_summary_unique_key", []),
+                ("cfda", "cfda_number", ["cfda_title"]),
+                ("naics", "naics_code", ["naics_description"]),
+                (
+                    "ppopct",
+                    "prime_award_transaction_place_of_performance_county_fips_code",
+                    [],
+                ),
+                (
+                    "psc",
+                    "product_or_service_code",
+                    ["product_or_service_code_description"],
+                ),
+                ("uei", "recipient_uei", ["recipient_name"]),
+            )
+        ],
+        {"postgresql_partition_by": "RANGE (action_date)"},
+    )
+
+
+class LoadManifest(Base, HasId):
+    __tablename__ = "load_manifest"
+
+    start_date: Mapped[date] = mapped_column(
+        doc="""First date of the bulk download payload date range."""
+    )
+    end_date: Mapped[date] = mapped_column(
+        doc="""Last date of the bulk download payload date range."""
+    )
+    date_type: Mapped[str] = mapped_column(
+        server_default="action_date",
+        doc="""'action_date' or 'last_modified_date', the date the payload
+        date range filters on.""",
+    )
+    csv_name: Mapped[Optional[str]] = mapped_column(
+        doc="""Name of a CSV file loaded from the payload's download. NULL for
+        the row tracking the payload itself."""
+    )
+    state: Mapped[str] = mapped_column(
+        doc="""'submitted', 'downloaded' or 'committed'. CSV rows are written in
+        the same transaction as their COPY, so they are always 'committed'."""
+    )
+    status_url: Mapped[Optional[str]] = mapped_column(
+        doc="""USAs bulk download job status url."""
+    )
+    file_url: Mapped[Optional[str]] = mapped_column(
+        doc="""USAs bulk download file url."""
+    )
+    file_checksum: Mapped[Optional[str]] = mapped_column(
+        doc="""sha256 hex digest of the downloaded zip."""
+    )
+    row_count: Mapped[Optional[int]] = mapped_column(
+        doc="""Rows copied from csv_name."""
+    )
+    chunk_start: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        doc="""Byte offset in csv_name where a separately copied chunk starts.
+        NULL for rows covering the whole CSV.""",
+    )
+    chunk_end: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        doc="""Byte offset in csv_name just past the end of the chunk.""",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+
+class TransactionsWatermark(Base):
+    __tablename__ = "transactions_watermark"
+
+    source: Mapped[str] = mapped_column(
+        primary_key=True,
+        doc="""Raw table transactions is built from, e.g.
+        'assistance_transactions'.""",
+    )
+    last_id: Mapped[int] = mapped_column(
+        BigInteger,
+        doc="""Highest id of source already merged into transactions.""",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    name: Mapped[str] = mapped_column(
+        primary_key=True,
+        doc="""Data set the version tracks, e.g. 'transactions'.""",
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        doc="""Incremented each time the data set changes.""",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
+
+
+class SummaryTableCacheEntry(Base):
+    __tablename__ = "summary_table_cache"
+    # shared by every API worker. Only a cache, so skip the WAL: faster writes,
+    # emptied after a crash.
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key_hash: Mapped[str] = mapped_column(
+        primary_key=True,
+        doc="""sha256 of the canonical summary table request, see
+        summary_table_cache.create_cache_key.""",
+    )
+    data_version: Mapped[int] = mapped_column(
+        BigInteger,
+        doc="""data_version.version of transactions the response was built
+        from.""",
+    )
+    response: Mapped[dict] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
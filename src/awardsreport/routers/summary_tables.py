@@ -1,10 +1,9 @@
 from awardsreport import log_config
-from awardsreport.database import get_db
-from awardsreport.logic import summary_tables
+from awardsreport.database import async_sess
+from awardsreport.logic import data_version, summary_tables
 from awardsreport.schemas import summary_tables_schemas
-from awardsreport.services import summary_table_formatter
+from awardsreport.services import summary_table_cache, summary_table_formatter
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 from typing import Annotated
 import logging.config
 
@@ -12,6 +11,15 @@ logging.config.dictConfig(log_config.LOGGING_CONFIG)
 logger = logging.getLogger("awardsreport")
 
 router = APIRouter(prefix="/summary_tables")
+# query parameter schemas, their validation errors respond 422.
+REQUEST_SCHEMAS = (
+    summary_tables_schemas.GroupByStatementSchema,
+    summary_tables_schemas.FilterStatementSchema,
+    summary_tables_schemas.LimitStatementSchema,
+)
+
+cache = summary_table_cache.SummaryTableCache()
+single_flight = summary_table_cache.SingleFlight()
 
 
 @router.get(
@@ -20,7 +28,6 @@ router = APIRouter(prefix="/summary_tables")
     response_model_exclude_none=True,
 )
 async def create_summary_table(
-    db: Annotated[Session, Depends(get_db)],
     group_by_schema: Annotated[
         summary_tables_schemas.GroupByStatementSchema, Depends()
     ],
@@ -31,10 +38,47 @@ async def create_summary_table(
 
     returns `limit` rows descending by total spending.
     """
-    stmt = summary_tables.create_group_by_sum_filter_limit_statement(
+
+    key = summary_table_cache.create_cache_key(
         group_by_schema, filter_schema, limit_schema
     )
-    results = db.execute(stmt)
-    return summary_table_formatter.create_table_schema_response(
-        group_by_schema, results
-    )
+
+    async def load() -> dict:
+        # the session belongs to the shared execution rather than to the
+        # request that started it, which may be cancelled before the others.
+        async with async_sess() as db:
+
+            async def get_version() -> int:
+                return await db.run_sync(data_version.get_data_version)
+
+            async def compute() -> dict:
+                # another worker may have built the response already.
+                version = await get_version()
+                response = await db.run_sync(
+                    summary_table_cache.get_shared_response, key, version
+                )
+                if response is None:
+                    stmt = summary_tables.create_summary_table_statement(
+                        group_by_schema, filter_schema, limit_schema
+                    )
+                    results = await db.execute(stmt)
+                    response = summary_table_formatter.create_table_schema_response(
+                        group_by_schema, results
+                    )
+                    await db.run_sync(
+                        summary_table_cache.put_shared_response, key, version, response
+                    )
+                    await db.commit()
+                return response
+
+            return await cache.get_or_compute(key, compute, get_version)
+
+    # identical requests arriving together share one execution.
+    return await single_flight.do(key, load)
+
+
+@router.get("/cache_stats")
+async def get_cache_stats():
+    """Summary table cache hit, miss, eviction and invalidation counters, and
+    requests coalesced with an identical one in flight."""
+    return {**cache.stats(), **single_flight.stats()}
@@ -1,6 +1,10 @@
 from pydantic import BaseModel
 from typing import Literal
 
+# USAs bulk download date filters. action_date selects transactions by when
+# they happened, last_modified_date by when USAs last changed them.
+DateType = Literal["action_date", "last_modified_date"]
+
 
 class AwardsPayloadFilterDateRange(BaseModel):
     start_date: str
@@ -15,7 +19,7 @@ class AwardsPayloadFilterAgencies(BaseModel):
 
 class AwardsPayloadFilters(BaseModel):
     prime_award_types: list[str]
-    date_type: Literal["action_date"] = "action_date"
+    date_type: DateType = "action_date"
     date_range: AwardsPayloadFilterDateRange
     agencies: list[AwardsPayloadFilterAgencies]
 
@@ -4,6 +4,7 @@ from datetime import date
 from fastapi import Query
 from pydantic import BaseModel, validator, Field, create_model
 from typing import Literal, Optional, Annotated, Union
+import re
 
 gb_values = Literal[
     "atc",
@@ -115,6 +116,27 @@ class FilterStatementSchema(BaseModel):
         ),
     ] = None
 
+    @validator("start_date", "end_date")
+    def date_format(cls, v):
+        if v is not None:
+            try:
+                date.fromisoformat(v)
+            except ValueError:
+                raise ValueError(f"invalid date {v}, expected 'YYYY-MM-DD'.")
+        return v
+
+    @validator("y", each_item=True)
+    def y_range(cls, v):
+        if not 1 <= v <= 9999:
+            raise ValueError(f"invalid y {v}, expected a year from 1 to 9999.")
+        return v
+
+    @validator("ym", each_item=True)
+    def ym_format(cls, v):
+        if not re.fullmatch(r"(?!0000)\d{4}-(0[1-9]|1[0-2])", v):
+            raise ValueError(f"invalid ym {v}, expected 'YYYY-MM'.")
+        return v
+
     def __getitem__(self, item):
         return getattr(self, item)
 
@@ -0,0 +1,69 @@
+from awardsreport.database import engine
+from awardsreport.logic import data_version
+from typing import Callable
+import logging
+import select
+import threading
+
+logger = logging.getLogger(__name__)
+
+# seconds to wait before reconnecting after the listening connection fails.
+RETRY_SECONDS = 5.0
+
+
+class DataVersionListener(threading.Thread):
+    """Push new data versions to a callback as loaders commit them.
+
+    LISTENs on data_version.CHANNEL over a connection of its own, outside the
+    engine's pool. The current version is also passed on each (re)connect, so
+    changes made while disconnected are not missed.
+
+    params:
+        on_version: Callable[[int], None] e.g. SummaryTableCache.set_version.
+        name: str data set to follow.
+    """
+
+    def __init__(
+        self,
+        on_version: Callable[[int], None],
+        name: str = data_version.TRANSACTIONS,
+    ) -> None:
+        super().__init__(name="data-version-listener", daemon=True)
+        self.on_version = on_version
+        self.data_set = name
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("data version listener failed, reconnecting")
+                self._stop_event.wait(RETRY_SECONDS)
+
+    def listen(self) -> None:
+        pooled = engine.raw_connection()
+        conn = pooled.driver_connection
+        pooled.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {data_version.CHANNEL}")
+            with engine.connect() as sa_conn:
+                self.on_version(data_version.get_data_version(sa_conn, self.data_set))
+            while not self._stop_event.is_set():
+                # wake up regularly to check for stop().
+                if not select.select([conn], [], [], 1.0)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    name, version = data_version.parse_notification(notify.payload)
+                    if name == self.data_set:
+                        logger.info(f"{name} data version is now {version}")
+                        self.on_version(version)
+        finally:
+            pooled.close()
@@ -0,0 +1,241 @@
+from awardsreport.models import SummaryTableCacheEntry
+from awardsreport.schemas import summary_tables_schemas
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, TypeVar
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+# memory budget for cached responses, measured as their JSON size.
+DEFAULT_MAX_BYTES = int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# seconds between data version lookups. Responses can be this stale after a
+# load.
+DEFAULT_VERSION_CHECK_SECONDS = 5.0
+
+T = TypeVar("T")
+
+
+def create_cache_key(
+    group_by_schema: summary_tables_schemas.GroupByStatementSchema,
+    filter_schema: summary_tables_schemas.FilterStatementSchema,
+    limit_schema: summary_tables_schemas.LimitStatementSchema,
+) -> str:
+    """Create a key that is the same for requests with the same response.
+
+    gb keeps its order, it orders the response columns. Filter values are
+    deduplicated and sorted, empty filters dropped and dates normalized.
+
+    params:
+        group_by_schema: summary_tables_schemas.GroupByStatementSchema
+        filter_schema: summary_tables_schemas.FilterStatementSchema
+        limit_schema: summary_tables_schemas.LimitStatementSchema
+
+    returns str canonical JSON of the request.
+    """
+    filters = {}
+    for key in sorted(filter_schema.__fields__):
+        value = filter_schema[key]
+        if not value:
+            continue
+        if key in ("start_date", "end_date"):
+            filters[key] = date.fromisoformat(value).isoformat()
+        else:
+            filters[key] = sorted(set(value))
+    return json.dumps(
+        {"gb": group_by_schema.gb, "filters": filters, "limit": limit_schema.limit},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+def hash_cache_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_shared_response(db: Session, key: str, version: int) -> dict | None:
+    """Get a response cached by any API worker for the data version.
+
+    params:
+        db: Session
+        key: str see create_cache_key.
+        version: int current data version.
+
+    returns dict | None response, None if not cached.
+    """
+    return db.execute(
+        select(SummaryTableCacheEntry.response).where(
+            SummaryTableCacheEntry.key_hash == hash_cache_key(key),
+            SummaryTableCacheEntry.data_version == version,
+        )
+    ).scalar()
+
+
+def put_shared_response(db: Session, key: str, version: int, response: dict) -> None:
+    """Cache a response for every API worker.
+
+    An entry built from a newer data version is never replaced. Entries from
+    older versions are deleted by data_version.bump_data_version.
+
+    params:
+        db: Session, committed by the caller.
+        key: str see create_cache_key.
+        version: int data version the response was built from.
+        response: dict
+    """
+    stmt = insert(SummaryTableCacheEntry).values(
+        key_hash=hash_cache_key(key), data_version=version, response=response
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SummaryTableCacheEntry.key_hash],
+            set_=dict(
+                data_version=stmt.excluded.data_version,
+                response=stmt.excluded.response,
+                created_at=stmt.excluded.created_at,
+            ),
+            where=SummaryTableCacheEntry.data_version < stmt.excluded.data_version,
+        )
+    )
+
+
+class SummaryTableCache:
+    """LRU cache of summary table responses within a byte budget.
+
+    Entries are dropped whenever the data version changes, see
+    logic.data_version. The version is polled every version_check_seconds,
+    or pushed with set_version, see data_version_listener. Safe to use from
+    several threads.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        version_check_seconds: float = DEFAULT_VERSION_CHECK_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.version_check_seconds = version_check_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._bytes = 0
+        self._version: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def set_version(self, version: int) -> None:
+        """Record the current data version, dropping every entry if it changed."""
+        with self._lock:
+            self._checked_at = self._clock()
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict]],
+        get_version: Callable[[], Awaitable[int]],
+    ) -> dict:
+        """Get the cached response for key, computing and caching it if needed.
+
+        params:
+            key: str see create_cache_key.
+            compute: Callable[[], Awaitable[dict]] builds the response.
+            get_version: Callable[[], Awaitable[int]] reads the current data
+                version.
+
+        returns dict response.
+        """
+        if self._clock() - self._checked_at >= self.version_check_seconds:
+            self.set_version(await get_version())
+        version = self._version
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = await compute()
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            # skip responses computed while the data changed, or too big.
+            if version != self._version or size > self.max_bytes:
+                return value
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+            self._entries[key] = (value, size)
+            self._bytes += size
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "data_version": self._version,
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first call for a key runs it as a task; calls arriving while it is in
+    flight wait for that task and get its result or exception. A caller being
+    cancelled does not cancel the task for the others. Use from one event
+    loop.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn(), or the execution already in flight for key.
+
+        params:
+            key: str see create_cache_key.
+            fn: Callable[[], Awaitable[T]] only called if key is not in flight.
+
+        returns T result of the execution.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,88 @@
+import argparse
+import time
+from sqlalchemy import Connection, Select, text
+
+from awardsreport.database import engine
+from awardsreport.logic import summary_tables
+from awardsreport.schemas import summary_tables_schemas
+
+# indexes supporting summary_tables filters, see Transactions.__table_args__.
+SUMMARY_INDEXES = (
+    "ix_transactions_action_date_brin",
+    "ix_transactions_awag",
+    "ix_transactions_awid",
+    "ix_transactions_cfda",
+    "ix_transactions_naics",
+    "ix_transactions_ppopct",
+    "ix_transactions_psc",
+    "ix_transactions_uei",
+)
+
+# representative /summary_tables/ requests as (gb, filters).
+QUERIES = [
+    (["awag"], dict(y=[2023])),
+    (["ym"], dict(start_date="2023-01-01", end_date="2023-03-31")),
+    (["naics"], dict(awag=["097"])),
+    (["awag", "ym"], dict(awag=["097"], y=[2023])),
+    (["psc"], dict(cfda=["93.778"], y=[2022, 2023])),
+    (["uei"], dict(ppopct=["06037"])),
+    (["awid"], dict(uei=["ZQGGHJH74DW7"])),
+    (["y"], dict(awid=["CONT_AWD_0001_9700_SPE2DX22D0001_9700"])),
+]
+
+
+def get_statement(gb: list[str], filters: dict) -> Select:
+    return summary_tables.create_group_by_sum_filter_limit_statement(
+        summary_tables_schemas.GroupByStatementSchema(gb=gb),
+        summary_tables_schemas.FilterStatementSchema(**filters),
+        summary_tables_schemas.LimitStatementSchema(),
+    )
+
+
+def explain(conn: Connection, stmt: Select, analyze: bool = False) -> list[str]:
+    """Get the query plan of stmt.
+
+    args
+        conn: Connection
+        stmt: Select summary table statement.
+        analyze: bool run the query and include actual timings and buffers.
+
+    returns list[str] plan lines.
+    """
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    sql = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    return list(conn.execute(text(f"EXPLAIN ({options}) {sql}")).scalars())
+
+
+def print_plans(conn: Connection, label: str, analyze: bool) -> None:
+    for gb, filters in QUERIES:
+        t0 = time.monotonic()
+        plan = explain(conn, get_statement(gb, filters), analyze)
+        print(f"-- {label} gb={gb} filters={filters} ({time.monotonic() - t0:.3f}s)")
+        print("\n".join(plan), end="\n\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print query plans of representative summary table queries"
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="Run the queries and show actual timings and buffers (EXPLAIN ANALYZE).",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also show each plan without the summary indexes. The indexes are dropped in a transaction that is rolled back, which locks transactions meanwhile; do not use against a database serving the API.",
+    )
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        if args.compare:
+            for name in SUMMARY_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            print_plans(conn, "without summary indexes", args.analyze)
+            conn.rollback()
+        print_plans(conn, "with summary indexes", args.analyze)
+        conn.rollback()
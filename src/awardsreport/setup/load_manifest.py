@@ -0,0 +1,208 @@
+from datetime import date
+from sqlalchemy import Connection, Row, insert, select, update
+from typing import Optional
+
+from awardsreport.models import LoadManifest as LM
+from awardsreport.schemas.seed_helpers_schemas import DateType
+
+SUBMITTED = "submitted"
+DOWNLOADED = "downloaded"
+COMMITTED = "committed"
+# a committed CSV or chunk loaded from an earlier archive than the last one
+# downloaded for its payload.
+SUPERSEDED = "superseded"
+
+
+def get_payload_unit(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    date_type: DateType = "action_date",
+) -> Optional[Row]:
+    """Get the most recent manifest row tracking a bulk download payload.
+
+    args
+        conn: Connection
+        start_date: date first date of the payload date range.
+        end_date: date last date of the payload date range.
+        date_type: DateType date the payload date range filters on.
+
+    returns Optional[Row] LoadManifest row with csv_name NULL, or None if the
+    payload has never been submitted.
+    """
+    return conn.execute(
+        select(LM)
+        .where(
+            LM.start_date == start_date,
+            LM.end_date == end_date,
+            LM.date_type == date_type,
+            LM.csv_name.is_(None),
+        )
+        .order_by(LM.id.desc())
+        .limit(1)
+    ).first()
+
+
+def record_submitted(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    status_url: str,
+    file_url: str,
+    date_type: DateType = "action_date",
+) -> int:
+    """Record a newly submitted bulk download job for a payload.
+
+    An existing payload row is reset to 'submitted' with the new job urls.
+
+    returns int LoadManifest.id of the payload row.
+    """
+    unit = get_payload_unit(conn, start_date, end_date, date_type)
+    values = dict(
+        state=SUBMITTED, status_url=status_url, file_url=file_url, file_checksum=None
+    )
+    if unit is None:
+        return conn.execute(
+            insert(LM)
+            .values(
+                start_date=start_date, end_date=end_date, date_type=date_type, **values
+            )
+            .returning(LM.id)
+        ).scalar_one()
+    conn.execute(update(LM).where(LM.id == unit.id).values(**values))
+    return unit.id
+
+
+def record_downloaded(conn: Connection, unit_id: int, file_checksum: str) -> None:
+    conn.execute(
+        update(LM)
+        .where(LM.id == unit_id)
+        .values(state=DOWNLOADED, file_checksum=file_checksum)
+    )
+
+
+def record_payload_committed(conn: Connection, unit_id: int) -> None:
+    conn.execute(update(LM).where(LM.id == unit_id).values(state=COMMITTED))
+
+
+def supersede_stale_csvs(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    file_checksum: str,
+    date_type: DateType = "action_date",
+) -> list[str]:
+    """Mark a payload's CSVs and chunks loaded from another archive superseded.
+
+    USAs can regenerate a download, e.g. when a job is resubmitted, so CSVs of
+    the same name may hold different rows. Superseded CSVs are no longer
+    returned by get_committed_csvs or get_committed_chunks and are loaded
+    again.
+
+    args
+        conn: Connection
+        start_date: date first date of the payload date range.
+        end_date: date last date of the payload date range.
+        file_checksum: str sha256 hex digest of the archive just downloaded.
+        date_type: DateType date the payload date range filters on.
+
+    returns list[str] csv_name of the superseded CSVs and chunks.
+    """
+    return list(
+        conn.execute(
+            update(LM)
+            .where(
+                LM.start_date == start_date,
+                LM.end_date == end_date,
+                LM.date_type == date_type,
+                LM.csv_name.is_not(None),
+                LM.state == COMMITTED,
+                LM.file_checksum.is_distinct_from(file_checksum),
+            )
+            .values(state=SUPERSEDED)
+            .returning(LM.csv_name)
+        ).scalars()
+    )
+
+
+def get_committed_csvs(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    date_type: DateType = "action_date",
+) -> set[str]:
+    """Get the names of CSVs already loaded for a payload.
+
+    returns set[str] csv_name of CSVs fully committed for the payload date
+    range. CSVs with only some chunks committed are not included.
+    """
+    return set(
+        conn.execute(
+            select(LM.csv_name).where(
+                LM.start_date == start_date,
+                LM.end_date == end_date,
+                LM.date_type == date_type,
+                LM.csv_name.is_not(None),
+                LM.chunk_start.is_(None),
+                LM.state == COMMITTED,
+            )
+        ).scalars()
+    )
+
+
+def get_committed_chunks(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    csv_name: str,
+    date_type: DateType = "action_date",
+) -> dict[tuple[int, int], int]:
+    """Get the byte ranges of a CSV's chunks that are already loaded.
+
+    returns dict[tuple[int, int], int] row_count of committed chunks keyed by
+    (chunk_start, chunk_end).
+    """
+    return {
+        (row.chunk_start, row.chunk_end): row.row_count
+        for row in conn.execute(
+            select(LM.chunk_start, LM.chunk_end, LM.row_count).where(
+                LM.start_date == start_date,
+                LM.end_date == end_date,
+                LM.date_type == date_type,
+                LM.csv_name == csv_name,
+                LM.chunk_start.is_not(None),
+                LM.state == COMMITTED,
+            )
+        )
+    }
+
+
+def record_csv_committed(
+    conn: Connection,
+    start_date: date,
+    end_date: date,
+    csv_name: str,
+    row_count: int,
+    file_checksum: Optional[str] = None,
+    chunk_start: Optional[int] = None,
+    chunk_end: Optional[int] = None,
+    date_type: DateType = "action_date",
+) -> None:
+    """Record a loaded CSV, or a loaded chunk of one.
+
+    Execute in the same transaction as the CSV's COPY so the manifest and the
+    loaded rows are committed or rolled back together.
+    """
+    conn.execute(
+        insert(LM).values(
+            start_date=start_date,
+            end_date=end_date,
+            date_type=date_type,
+            csv_name=csv_name,
+            state=COMMITTED,
+            row_count=row_count,
+            file_checksum=file_checksum,
+            chunk_start=chunk_start,
+            chunk_end=chunk_end,
+        )
+    )
@@ -0,0 +1,263 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from sqlalchemy import Connection, Index, text
+from sqlalchemy.schema import CreateIndex
+from typing import Iterator, Type
+
+from awardsreport.logging_setup import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+from awardsreport.database import Base, engine
+from awardsreport.models import (
+    AssistanceTransactions,
+    ProcurementTransactions,
+    Transactions,
+)
+from awardsreport.setup import partitions, table_swap
+from awardsreport.setup.seed_helpers import UNIQUE_KEYS
+
+# tables loaded in bulk, maintained after each load.
+TABLES = [AssistanceTransactions, ProcurementTransactions, Transactions]
+# columns merges look rows up by. Their indexes are kept by
+# drop_secondary_indexes, or every merge statement would scan the table.
+MERGE_KEYS = set(UNIQUE_KEYS.values())
+# indexes built at once. Each holds one db connection.
+DEFAULT_WORKERS = 4
+# memory each index build may use to sort, applied with SET LOCAL.
+INDEX_MAINTENANCE_WORK_MEM = "256MB"
+# correlated columns the planner should know about, keyed by statistics name.
+# A statistics object is only created on tables that have all its columns.
+EXTENDED_STATISTICS = {
+    "awarding_agency": (
+        "awarding_agency_code",
+        "awarding_agency_name",
+        "awarding_sub_agency_name",
+    ),
+    "funding_agency": (
+        "funding_agency_code",
+        "funding_agency_name",
+        "funding_sub_agency_code",
+        "funding_sub_agency_name",
+    ),
+    "cfda": ("cfda_number", "cfda_title"),
+}
+
+
+@contextmanager
+def timed(timings: dict[str, float], step: str) -> Iterator[None]:
+    """Record the seconds taken by a step in timings and log them."""
+    t0 = time.monotonic()
+    yield
+    timings[step] = time.monotonic() - t0
+    logger.info("%s elapsed=%.3fs", step, timings[step])
+
+
+def get_secondary_indexes(table: Type[Base]) -> list[Index]:
+    """Get the indexes declared on table's model, not counting constraints."""
+    return sorted(table.__table__.indexes, key=lambda ix: str(ix.name))
+
+
+def is_merge_key_index(index: Index) -> bool:
+    return len(index.columns) == 1 and index.columns[0].key in MERGE_KEYS
+
+
+def get_missing_indexes(conn: Connection, table: Type[Base]) -> list[Index]:
+    """Get the indexes declared on table's model that do not exist in the db."""
+    existing = table_swap.get_index_ddl(conn, table.__tablename__)
+    return [ix for ix in get_secondary_indexes(table) if ix.name not in existing]
+
+
+def drop_secondary_indexes(conn: Connection, table: Type[Base]) -> list[str]:
+    """Drop table's secondary indexes ahead of a bulk load.
+
+    Only indexes declared on the model are dropped, so build_missing_indexes
+    can recreate them from the model afterwards, even from another process.
+    Primary keys and MERGE_KEYS indexes are kept. DROP INDEX locks out
+    readers of the table until conn's transaction ends, so commit before
+    loading.
+
+    returns list[str] names of the dropped indexes.
+    """
+    existing = table_swap.get_index_ddl(conn, table.__tablename__)
+    dropped = [
+        str(ix.name)
+        for ix in get_secondary_indexes(table)
+        if ix.name in existing and not is_merge_key_index(ix)
+    ]
+    for name in dropped:
+        conn.execute(text(f"DROP INDEX {name}"))
+    logger.info(f"dropped indexes on {table.__tablename__}: {dropped}")
+    return dropped
+
+
+def build_index(index: Index) -> float:
+    """Create index in its own transaction.
+
+    returns float seconds taken.
+    """
+    t0 = time.monotonic()
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"SET LOCAL maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'")
+        )
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    return time.monotonic() - t0
+
+
+def build_missing_indexes(
+    tables: list[Type[Base]], workers: int = DEFAULT_WORKERS
+) -> list[str]:
+    """Create the model indexes missing from tables, workers at a time.
+
+    Each index is built on its own connection. Builds on the same table only
+    take SHARE locks, so they do not block each other.
+
+    returns list[str] names of the built indexes.
+    """
+    with engine.connect() as conn:
+        missing = [ix for t in tables for ix in get_missing_indexes(conn, t)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_index, ix): ix for ix in missing}
+        for done, future in enumerate(as_completed(futures), start=1):
+            logger.info(
+                "built %s elapsed=%.3fs (%s/%s indexes)",
+                futures[future].name,
+                future.result(),
+                done,
+                len(futures),
+            )
+    return [str(ix.name) for ix in missing]
+
+
+def create_extended_statistics(conn: Connection, table: Type[Base]) -> list[str]:
+    """Create the EXTENDED_STATISTICS that apply to table.
+
+    Statistics are created on a partitioned table and on each of its
+    partitions: the planner uses the partition's own statistics once a query
+    is pruned to it. They are empty until the table is analyzed.
+
+    returns list[str] names of the statistics objects, including ones that
+    already existed.
+    """
+    columns = set(table.__table__.c.keys())
+    names = []
+    for rel in [table.__tablename__] + partitions.get_partitions(
+        conn, table.__tablename__
+    ):
+        for key, cols in EXTENDED_STATISTICS.items():
+            if not columns.issuperset(cols):
+                continue
+            name = f"stx_{rel}_{key}"
+            conn.execute(
+                text(
+                    f"CREATE STATISTICS IF NOT EXISTS {name} (ndistinct, dependencies) "
+                    f"ON {', '.join(cols)} FROM {rel}"
+                )
+            )
+            names.append(name)
+    return names
+
+
+def get_primary_key_name(conn: Connection, table_name: str) -> str:
+    return next(
+        name
+        for name, ddl in table_swap.get_constraint_ddl(conn, table_name).items()
+        if ddl.startswith("PRIMARY KEY")
+    )
+
+
+def run_maintenance(
+    tables: list[Type[Base]] = TABLES,
+    workers: int = DEFAULT_WORKERS,
+    cluster: bool = False,
+) -> dict[str, float]:
+    """Bring tables back into shape after a bulk load.
+
+    Steps, each timed:
+    1. cluster (optional): rewrite each table in primary key, i.e.
+       action_date, order. Runs first so the secondary indexes are only built
+       once, on the rewritten table.
+    2. indexes: build the model indexes missing from each table, see
+       drop_secondary_indexes.
+    3. statistics: create EXTENDED_STATISTICS.
+    4. vacuum: update the visibility map so index-only scans skip the heap.
+    5. analyze: refresh planner statistics, including the extended ones.
+
+    CLUSTER, VACUUM and ANALYZE run outside a transaction. CLUSTER locks out
+    readers of the table while it runs.
+
+    args
+        tables: list[Type[Base]] tables to maintain.
+        workers: int indexes built at once.
+        cluster: bool run step 1.
+
+    returns dict[str, float] seconds taken keyed by step.
+    """
+    timings: dict[str, float] = {}
+    autocommit = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    with autocommit as conn:
+        if cluster:
+            with timed(timings, "cluster"):
+                for table in tables:
+                    pkey = get_primary_key_name(conn, table.__tablename__)
+                    conn.execute(text(f"CLUSTER {table.__tablename__} USING {pkey}"))
+        with timed(timings, "indexes"):
+            build_missing_indexes(tables, workers)
+        with timed(timings, "statistics"):
+            for table in tables:
+                create_extended_statistics(conn, table)
+        with timed(timings, "vacuum"):
+            for table in tables:
+                conn.execute(text(f"VACUUM {table.__tablename__}"))
+        with timed(timings, "analyze"):
+            for table in tables:
+                conn.execute(text(f"ANALYZE {table.__tablename__}"))
+    logger.info(
+        "maintenance done "
+        + " ".join(f"{step}={dt:.3f}s" for step, dt in timings.items())
+    )
+    return timings
+
+
+if __name__ == "__main__":
+    tables = {t.__tablename__: t for t in TABLES}
+    parser = argparse.ArgumentParser(
+        description="Rebuild indexes, create statistics, VACUUM and ANALYZE after a bulk load"
+    )
+    parser.add_argument(
+        "-t",
+        "--tables",
+        nargs="+",
+        choices=list(tables),
+        default=list(tables),
+        help="Tables to maintain (default = all).",
+    )
+    parser.add_argument(
+        "--drop-indexes",
+        action="store_true",
+        help="Only drop the secondary indexes of the tables, before a bulk load. Rerun without this flag after the load to rebuild them.",
+    )
+    parser.add_argument(
+        "--cluster",
+        action="store_true",
+        help="CLUSTER the tables by action_date first. Readers are locked out while each table is rewritten.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Indexes built at once, each over its own db connection (default = {DEFAULT_WORKERS}).",
+    )
+    args = parser.parse_args()
+    selected = [tables[name] for name in args.tables]
+    if args.drop_indexes:
+        with engine.begin() as conn:
+            for table in selected:
+                drop_secondary_indexes(conn, table)
+    else:
+        run_maintenance(selected, workers=args.workers, cluster=args.cluster)
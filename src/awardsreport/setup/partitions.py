@@ -0,0 +1,107 @@
+import logging
+import re
+from datetime import date
+from sqlalchemy import Connection, text
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# transaction tables are range partitioned on action_date, one partition per
+# calendar year, named <table>_y<year>.
+PARTITION_NAME_RE = re.compile(r"_y\d{4}$")
+
+
+def partition_name(table_name: str, year: int) -> str:
+    return f"{table_name}_y{year}"
+
+
+def is_partition_name(name: str) -> bool:
+    return PARTITION_NAME_RE.search(name) is not None
+
+
+def create_year_partition_sql(table_name: str, year: int) -> str:
+    """Generate sql creating the partition of table_name for year.
+
+    args
+        table_name: str table partitioned by RANGE (action_date).
+        year: int calendar year of action_date held by the partition.
+
+    returns str CREATE TABLE ... PARTITION OF statement. Does nothing if the
+    partition exists.
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table_name, year)} "
+        f"PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    )
+
+
+def ensure_partitions(conn: Connection, table_name: str, years: Iterable[int]) -> None:
+    """Create any missing year partitions of table_name.
+
+    Run before loading rows so every action_date has a partition to go to.
+
+    args
+        conn: Connection
+        table_name: str table partitioned by RANGE (action_date).
+        years: Iterable[int] calendar years that need a partition.
+    """
+    existing = set(get_partitions(conn, table_name))
+    for year in sorted(set(years)):
+        if partition_name(table_name, year) not in existing:
+            logger.info(f"creating partition {partition_name(table_name, year)}")
+            conn.execute(text(create_year_partition_sql(table_name, year)))
+
+
+def get_years(start_date: date, end_date: date) -> range:
+    """Get the calendar years spanned by start_date through end_date."""
+    return range(start_date.year, end_date.year + 1)
+
+
+def get_partitions(conn: Connection, table_name: str) -> list[str]:
+    """Get the names of table_name's partitions.
+
+    returns list[str] partition names, empty if table_name is not partitioned.
+    """
+    return list(
+        conn.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = CAST(:table_name AS regclass)
+                ORDER BY c.relname
+                """
+            ),
+            dict(table_name=table_name),
+        ).scalars()
+    )
+
+
+def get_partition_years(conn: Connection, table_name: str) -> list[int]:
+    """Get the years of table_name's existing year partitions."""
+    prefix = f"{table_name}_y"
+    return [
+        int(name[len(prefix) :])
+        for name in get_partitions(conn, table_name)
+        if name.startswith(prefix) and is_partition_name(name)
+    ]
+
+
+def get_partition_key(conn: Connection, table_name: str) -> Optional[str]:
+    """Get the partition key definition of table_name.
+
+    returns Optional[str] e.g. 'RANGE (action_date)', None if table_name is
+    not partitioned.
+    """
+    return conn.execute(
+        text(
+            """
+            SELECT pg_get_partkeydef(partrelid)
+            FROM pg_partitioned_table
+            WHERE partrelid = CAST(:table_name AS regclass)
+            """
+        ),
+        dict(table_name=table_name),
+    ).scalar()
@@ -0,0 +1,120 @@
+import argparse
+import logging
+import time
+from sqlalchemy import Connection, text
+from sqlalchemy.dialects import postgresql
+from typing import Optional
+
+from awardsreport.logging_setup import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+from awardsreport.database import engine
+from awardsreport.logic import data_version
+from awardsreport.logic.summary_tables import ROLLUPS, Rollup, create_rollup_select
+
+
+def create_rollup_sql(rollup: Rollup, name: Optional[str] = None) -> list[str]:
+    """Generate sql creating rollup's materialized view and its unique index.
+
+    The unique index lets the view be refreshed concurrently. Grouped columns
+    can be NULL, so NULLs are not distinct.
+
+    args
+        rollup: Rollup
+        name: Optional[str] create the view under this name instead of
+            rollup.name.
+
+    returns list[str] statements, to run in order. Existing objects are kept.
+    """
+    name = name or rollup.name
+    query = create_rollup_select(rollup).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    cols = ", ".join(col.key for col in rollup.columns)
+    return [
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query}",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name} "
+        f"ON {name} ({cols}) NULLS NOT DISTINCT",
+    ]
+
+
+def create_rollups(conn: Connection) -> None:
+    for rollup in ROLLUPS:
+        for sql in create_rollup_sql(rollup):
+            conn.execute(text(sql))
+
+
+def build_new_rollups(conn: Connection) -> None:
+    """Create every rollup from transactions under a '_new' name.
+
+    Used when transactions is replaced: the existing rollups depend on the
+    replaced table and cannot be refreshed from the new one. Swap the new
+    rollups in with swap_new_rollups.
+    """
+    for rollup in ROLLUPS:
+        conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {rollup.name}_new"))
+        for sql in create_rollup_sql(rollup, f"{rollup.name}_new"):
+            conn.execute(text(sql))
+
+
+def swap_new_rollups(conn: Connection) -> None:
+    """Replace the rollups with the ones from build_new_rollups.
+
+    Only drops and renames, so summary tables are blocked briefly.
+    """
+    for rollup in ROLLUPS:
+        conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {rollup.name}"))
+        conn.execute(
+            text(f"ALTER MATERIALIZED VIEW {rollup.name}_new RENAME TO {rollup.name}")
+        )
+        conn.execute(
+            text(f"ALTER INDEX ux_{rollup.name}_new RENAME TO ux_{rollup.name}")
+        )
+
+
+def refresh_rollups(concurrently: bool = True) -> dict[str, float]:
+    """Recompute every rollup from transactions.
+
+    Run after transactions changes, summary tables read from rollups when they
+    can, see summary_tables.select_rollup. Rollups missing from the db are
+    created first. Each rollup is refreshed in its own transaction, and the
+    data version is bumped once all are.
+
+    args
+        concurrently: bool keep rollups readable while they refresh. Slower,
+            and fails for a view that was never populated.
+
+    returns dict[str, float] seconds taken keyed by rollup name.
+    """
+    timings = {}
+    with engine.begin() as conn:
+        create_rollups(conn)
+    for rollup in ROLLUPS:
+        t0 = time.monotonic()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "REFRESH MATERIALIZED VIEW "
+                    f"{'CONCURRENTLY ' if concurrently else ''}{rollup.name}"
+                )
+            )
+        timings[rollup.name] = time.monotonic() - t0
+        logger.info("refreshed %s elapsed=%.3fs", rollup.name, timings[rollup.name])
+    with engine.begin() as conn:
+        data_version.bump_data_version(conn)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh the summary table rollups from transactions"
+    )
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Refresh without CONCURRENTLY. Faster, but summary tables reading a rollup wait until it is refreshed.",
+    )
+    args = parser.parse_args()
+    refresh_rollups(concurrently=not args.blocking)
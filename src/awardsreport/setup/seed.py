@@ -1,16 +1,24 @@
 import argparse
 import logging
+import os
 import requests
 import csv
-from time import sleep
-from zipfile import ZipFile
+import hashlib
+import threading
 from io import BytesIO
-from glob import glob
-from typing import Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from requests.adapters import HTTPAdapter
+from time import sleep
+from zipfile import ZipFile, ZipInfo
+from typing import IO, Callable, Iterator, Optional
 import tempfile
 import json
 import time
 from typing import Any, Mapping
+from sqlalchemy import func, select
 
 from awardsreport.logging_setup import setup_logging
 
@@ -18,13 +26,119 @@ setup_logging()
 logger = logging.getLogger(__name__)
 
 from awardsreport.database import engine
+from awardsreport.schemas import seed_helpers_schemas
+from awardsreport.models import AssistanceTransactions, ProcurementTransactions
+from awardsreport.setup import (
+    load_manifest,
+    partitions,
+    seed_transactions_table,
+    staging,
+)
 from awardsreport.setup.seed_helpers import (
+    CsvChunk,
+    CsvHeaderReader,
+    PollPolicy,
     get_awards_payloads,
+    get_csv_members,
     generate_copy_from_sql,
+    get_table_for_fname,
+    is_transient_error,
+    iter_csv_chunks,
     USER_AGENT,
     AWARDS_DL_EP,
 )
 
+# bytes requested from the download stream per read.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# downloads larger than this roll over from memory to a file on disk.
+DOWNLOAD_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+# bulk download jobs polled, downloaded and copied at the same time.
+DEFAULT_MAX_WORKERS = 4
+# CSV files copied at the same time, each over its own db connection.
+DEFAULT_COPY_WORKERS = 4
+# CSV members larger than this are split into chunks that are copied in parallel.
+DEFAULT_CHUNK_SIZE = 256 * 1024 * 1024
+
+
+@dataclass
+class SeedRunMetrics:
+    """Running totals for a seed run, logged when the run finishes."""
+
+    downloaded_bytes: int = 0
+    download_seconds: float = 0.0
+    poll_wait_seconds: float = 0.0
+    status_requests: int = 0
+    status_retries: int = 0
+    copied_rows: int = 0
+    copied_bytes: int = 0
+    copy_seconds: float = 0.0
+    merged_inserted: int = 0
+    merged_updated: int = 0
+    merged_unchanged: int = 0
+    merged_duplicates: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, **totals: float) -> None:
+        """Add to the named totals. Safe to call from worker threads."""
+        with self._lock:
+            for name, value in totals.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def download_bytes_per_second(self) -> float:
+        if self.download_seconds == 0:
+            return 0.0
+        return self.downloaded_bytes / self.download_seconds
+
+    def log(self) -> None:
+        logger.info(
+            "run metrics downloaded_bytes=%s download_seconds=%.3f bytes_per_second=%.0f "
+            "poll_wait_seconds=%.3f status_requests=%s status_retries=%s "
+            "copied_rows=%s copied_bytes=%s copy_seconds=%.3f "
+            "merged_inserted=%s merged_updated=%s merged_unchanged=%s "
+            "merged_duplicates=%s",
+            self.downloaded_bytes,
+            self.download_seconds,
+            self.download_bytes_per_second,
+            self.poll_wait_seconds,
+            self.status_requests,
+            self.status_retries,
+            self.copied_rows,
+            self.copied_bytes,
+            self.copy_seconds,
+            self.merged_inserted,
+            self.merged_updated,
+            self.merged_unchanged,
+            self.merged_duplicates,
+        )
+
+
+@dataclass
+class DownloadJob:
+    """A bulk download job submitted to USAs for one payload."""
+
+    payload: seed_helpers_schemas.AwardsPayload
+    unit_id: int
+    status_url: str
+    file_url: str
+    # True if the job was submitted by an earlier run and picked up from
+    # load_manifest.
+    resumed: bool = False
+
+    @property
+    def start_date(self) -> date:
+        return date.fromisoformat(self.payload.filters.date_range.start_date)
+
+    @property
+    def end_date(self) -> date:
+        return date.fromisoformat(self.payload.filters.date_range.end_date)
+
+    @property
+    def date_type(self) -> seed_helpers_schemas.DateType:
+        return self.payload.filters.date_type
+
 
 def _sanitize_headers(h: Mapping[str, str]) -> dict[str, str]:
     # You only have User-Agent now, but this prevents future “oops we logged tokens”.
@@ -48,122 +162,914 @@ def _payload_for_log(payload_dict: dict[str, Any]) -> dict[str, Any]:
     return d
 
 
-def awards_usas_to_sql(
-    start_date: str,
-    end_date: Optional[str] = None,
-    selected_cols: Optional[list[str]] = None,
-):
-    def get_status(status_url):
+def create_session(max_workers: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Create a keep-alive HTTP session shared by all bulk download workers.
+
+    args
+        max_workers: int number of threads using the session at once. Sizes
+            the connection pool so workers don't open throwaway connections.
+
+    returns requests.Session with USER_AGENT headers.
+    """
+    session = requests.Session()
+    session.headers.update(USER_AGENT)
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def submit_download(
+    session: requests.Session, payload: seed_helpers_schemas.AwardsPayload
+) -> dict[str, Any]:
+    """POST payload to the USAs bulk download endpoint.
+
+    args
+        session: requests.Session shared HTTP session.
+        payload: seed_helpers_schemas.AwardsPayload download request.
+
+    returns dict[str, Any] bulk download response including status_url and file_url.
+    """
+    payload_dict = payload.dict()
+
+    logger.info(
+        "POST %s headers=%s body=%s",
+        AWARDS_DL_EP,
+        _sanitize_headers(session.headers),
+        json.dumps(_payload_for_log(payload_dict), sort_keys=True),
+    )
+
+    t0 = time.monotonic()
+    r = session.post(AWARDS_DL_EP, json=payload_dict, timeout=60)
+    dt = time.monotonic() - t0
+
+    logger.info(
+        "POST response status=%s elapsed=%.3fs content_type=%s",
+        r.status_code,
+        dt,
+        r.headers.get("content-type"),
+    )
+
+    if not r.ok:
+        logger.error("POST error body=%s", r.text[:2000])
+        r.raise_for_status()
+
+    j = r.json()
+    logger.info("POST json keys=%s", sorted(j.keys()))
+
+    logger.info(f"date_range: {payload.filters.date_range}")
+    logger.info(f"file_url: {j.get('file_url')}")
+    logger.info(f"status_url: {j.get('status_url')}")
+    return j
+
+
+def get_status(
+    session: requests.Session,
+    status_url: str,
+    policy: PollPolicy,
+    metrics: SeedRunMetrics,
+) -> str:
+    """GET the status of a bulk download job.
+
+    Timeouts, connection errors and 5xx responses are retried up to
+    policy.max_retries times with backoff.
+
+    returns str job status, e.g. 'running', 'finished' or 'failed'.
+    """
+    attempt = 0
+    while True:
         logger.info(f"GET status: {status_url}")
-        resp = requests.get(status_url, headers=USER_AGENT, timeout=60)
-        resp.raise_for_status()
-        j = resp.json()
-        logger.info(f"status response: {j}")
-        return j["status"]
+        metrics.add(status_requests=1)
+        try:
+            resp = session.get(status_url, timeout=policy.request_timeout)
+            resp.raise_for_status()
+            break
+        except requests.RequestException as e:
+            if attempt >= policy.max_retries or not is_transient_error(e):
+                raise
+            delay = policy.interval(attempt)
+            logger.warning(f"status request failed ({e}); retrying in {delay:.1f}s")
+            metrics.add(status_retries=1, poll_wait_seconds=delay)
+            sleep(delay)
+            attempt += 1
 
-    payloads = get_awards_payloads(start_date, end_date, columns=selected_cols)
-    logger.info("Starting seed run")
-    logger.info(f"payload count: {len(payloads)}")
+    j = resp.json()
+    logger.info(f"status response: {j}")
+    return j["status"]
+
+
+@dataclass
+class PolledJob:
+    """Polling state of a DownloadJob, see poll_jobs."""
+
+    job: DownloadJob
+    started: float
+    next_poll: float
+    attempt: int = 0
+
+
+def poll_jobs(
+    session: requests.Session,
+    jobs: list[DownloadJob],
+    policy: PollPolicy,
+    metrics: SeedRunMetrics,
+) -> Iterator[tuple[DownloadJob, Optional[Exception]]]:
+    """Poll bulk download jobs until each finishes, yielding them as they do.
+
+    Every job is polled from the calling thread on its own backoff schedule,
+    so a finished job is seen however many others are still running. A
+    resumed job that USAs no longer has is resubmitted and polled again. A
+    job failing does not stop the others being polled.
+
+    args
+        session: requests.Session shared HTTP session.
+        jobs: list[DownloadJob] from prepare_job.
+        policy: PollPolicy status polling policy.
+        metrics: SeedRunMetrics shared run metrics.
+
+    yields tuple[DownloadJob, Optional[Exception]] each job once: with None as
+    soon as its file is ready, otherwise with the error that failed it, e.g.
+    RuntimeError if USAs failed the job or TimeoutError if it is not finished
+    within policy.deadline seconds.
+    """
+    now = time.monotonic()
+    pending = [PolledJob(job, started=now, next_poll=now) for job in jobs]
+    while pending:
+        for polled in [p for p in pending if p.next_poll <= time.monotonic()]:
+            job = polled.job
+            try:
+                status = get_status(session, job.status_url, policy, metrics)
+                if status == "failed":
+                    raise RuntimeError(f"download failed: {job.status_url}")
+            except (RuntimeError, requests.HTTPError) as e:
+                if not job.resumed:
+                    pending.remove(polled)
+                    yield job, e
+                    continue
+                # USAs only keeps jobs around for a while; start over with a new one.
+                logger.warning(
+                    f"resumed job unavailable, resubmitting: {job.status_url}"
+                )
+                try:
+                    job = submit_job(session, job.payload)
+                except Exception as e:
+                    pending.remove(polled)
+                    yield polled.job, e
+                    continue
+                now = time.monotonic()
+                pending[pending.index(polled)] = PolledJob(job, now, next_poll=now)
+                continue
+            except Exception as e:
+                pending.remove(polled)
+                yield job, e
+                continue
+
+            if status == "finished":
+                pending.remove(polled)
+                yield job, None
+                continue
+            elapsed = time.monotonic() - polled.started
+            if elapsed >= policy.deadline:
+                pending.remove(polled)
+                yield job, TimeoutError(
+                    f"download not finished after {elapsed:.0f}s: {job.status_url}"
+                )
+                continue
+            delay = min(
+                policy.interval(polled.attempt), max(policy.deadline - elapsed, 0)
+            )
+            logger.info(f"status={status}; polling again in {delay:.1f}s")
+            polled.next_poll = time.monotonic() + delay
+            polled.attempt += 1
+
+        if pending:
+            delay = max(0.0, min(p.next_poll for p in pending) - time.monotonic())
+            metrics.add(poll_wait_seconds=delay)
+            sleep(delay)
+
+
+def run_jobs(
+    session: requests.Session,
+    jobs: list[DownloadJob],
+    policy: PollPolicy,
+    metrics: SeedRunMetrics,
+    executor: Executor,
+    load: Callable[[DownloadJob], None],
+) -> list[Exception]:
+    """Load each bulk download job as soon as its file is ready.
+
+    Jobs are polled with poll_jobs and handed to executor in the order they
+    finish, so a job that is ready never waits behind jobs still running on
+    USAs. Jobs failing, while polling or loading, do not stop the others.
+
+    args
+        session: requests.Session shared HTTP session.
+        jobs: list[DownloadJob] from prepare_job.
+        policy: PollPolicy status polling policy.
+        metrics: SeedRunMetrics shared run metrics.
+        executor: Executor runs load. Its worker count caps the number of
+            archives downloaded and copied at once.
+        load: Callable[[DownloadJob], None] downloads and copies a finished
+            job, e.g. load_download.
+
+    returns list[Exception] errors of the jobs that failed.
+    """
+    errors: list[Exception] = []
+    futures = {}
+    for job, error in poll_jobs(session, jobs, policy, metrics):
+        if error is not None:
+            logger.error(f"job failed: {job.status_url}: {error!r}")
+            errors.append(error)
+            continue
+        futures[executor.submit(load, job)] = job
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as e:
+            logger.exception(f"job failed: {futures[future].status_url}")
+            errors.append(e)
+    return errors
+
+
+def download_zip(
+    session: requests.Session, file_url: str, metrics: SeedRunMetrics
+) -> tuple[IO[bytes], str]:
+    """Stream file_url into a spooled temporary file.
+
+    The response body is read in DOWNLOAD_CHUNK_SIZE pieces, so memory use is
+    capped at DOWNLOAD_SPOOL_MAX_SIZE regardless of the archive size. The caller
+    is responsible for closing the returned file.
+
+    args
+        session: requests.Session shared HTTP session.
+        file_url: str url of the bulk download zip.
+        metrics: SeedRunMetrics updated with bytes and seconds spent downloading.
+
+    returns tuple[IO[bytes], str] seekable file positioned at the start of the
+    archive and the sha256 hex digest of its contents.
+    """
+    logger.info(f"Downloading zip: {file_url}")
+    spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_SIZE)
+    t0 = time.monotonic()
+    size = 0
+    checksum = hashlib.sha256()
+    try:
+        with session.get(file_url, stream=True, timeout=300) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+                checksum.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    dt = time.monotonic() - t0
+    spool.seek(0)
+
+    metrics.add(downloaded_bytes=size, download_seconds=dt)
     logger.info(
-        f"payload filter date ranges: {[p.filters.date_range for p in payloads]}"
+        "downloaded %s bytes in %.3fs (%.0f bytes/s)",
+        size,
+        dt,
+        size / dt if dt else 0.0,
     )
+    return spool, checksum.hexdigest()
 
-    conn = engine.raw_connection()
-    cursor = conn.cursor()
-    logger.info("DB connection established; starting downloads")
 
-    for payload in payloads:
-        payload_dict = payload.dict()
+def copy_csv_member(
+    cursor,
+    zip_ref: ZipFile,
+    member: ZipInfo,
+    extract_dir: Optional[str] = None,
+    target: Optional[str] = None,
+) -> None:
+    """COPY one CSV member of a bulk download archive into its target table.
 
-        logger.info(
-            "POST %s headers=%s body=%s",
-            AWARDS_DL_EP,
-            _sanitize_headers(USER_AGENT),
-            json.dumps(_payload_for_log(payload_dict), sort_keys=True),
+    args
+        cursor: DBAPI cursor used for copy_expert. The caller commits.
+        zip_ref: ZipFile open bulk download archive.
+        member: ZipInfo CSV member to copy.
+        extract_dir: Optional[str] directory to extract the member to before
+            copying. If None the member is decompressed straight into COPY
+            without touching disk.
+        target: Optional[str] table to COPY into instead of the member's
+            table, e.g. a staging table.
+    """
+    csv_name = os.path.basename(member.filename)
+
+    if extract_dir is None:
+        with zip_ref.open(member) as stream:
+            reader = CsvHeaderReader(stream)
+            copy_cmd = generate_copy_from_sql(
+                csv_name, columns=reader.columns, target=target
+            )
+            logger.info(f"copy_cmd for {csv_name}: {copy_cmd}")
+            cursor.copy_expert(copy_cmd, reader)
+        return
+
+    csv_path = zip_ref.extract(member, extract_dir)
+    try:
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            f.seek(0)
+
+            copy_cmd = generate_copy_from_sql(csv_name, columns=header, target=target)
+            logger.info(f"copy_cmd for {csv_name}: {copy_cmd}")
+            cursor.copy_expert(copy_cmd, f)
+    finally:
+        os.remove(csv_path)
+
+
+@contextmanager
+def copy_target(
+    conn,
+    csv_name: str,
+    use_staging: bool = False,
+    dedupe: bool = False,
+    metrics: Optional[SeedRunMetrics] = None,
+) -> Iterator[Optional[str]]:
+    """Choose the table a CSV is copied into within conn's transaction.
+
+    args
+        conn: Connection with an open transaction.
+        csv_name: str name of the CSV being copied.
+        use_staging: bool copy into an unlogged staging table that is
+            inserted into the CSV's table on exit, see staging.staging_table.
+        dedupe: bool copy into a staging table that is upserted into the
+            CSV's table on the transaction unique key, see
+            staging.merge_from_staging. Implies use_staging.
+        metrics: Optional[SeedRunMetrics] shared run metrics the merge counts
+            are added to.
+
+    yields Optional[str] staging table name, or None to copy straight into the
+    CSV's table.
+    """
+    if not (use_staging or dedupe):
+        staging.lock_raw_table(conn, get_table_for_fname(csv_name), shared=True)
+        yield None
+        return
+    counts = staging.MergeCounts() if dedupe else None
+    with staging.staging_table(conn, get_table_for_fname(csv_name), counts) as name:
+        yield name
+    if counts is not None and metrics is not None:
+        metrics.add(
+            merged_inserted=counts.inserted,
+            merged_updated=counts.updated,
+            merged_unchanged=counts.unchanged,
+            merged_duplicates=counts.duplicates,
+        )
+
+
+def load_csv_member(
+    zip_ref: ZipFile,
+    member: ZipInfo,
+    job: DownloadJob,
+    checksum: str,
+    metrics: SeedRunMetrics,
+    extract_dir: Optional[str] = None,
+    use_staging: bool = False,
+    dedupe: bool = False,
+) -> None:
+    """COPY a CSV member and record it in load_manifest in one transaction.
+
+    Uses its own pooled db connection so members can be loaded in parallel.
+
+    args
+        zip_ref: ZipFile open bulk download archive.
+        member: ZipInfo CSV member to copy.
+        job: DownloadJob the archive was downloaded for.
+        checksum: str sha256 hex digest of the archive.
+        metrics: SeedRunMetrics shared run metrics.
+        extract_dir: Optional[str] see copy_csv_member.
+        use_staging: bool see copy_target.
+        dedupe: bool see copy_target.
+    """
+    csv_name = os.path.basename(member.filename)
+    t0 = time.monotonic()
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        with copy_target(conn, csv_name, use_staging, dedupe, metrics) as target:
+            copy_csv_member(cursor, zip_ref, member, extract_dir, target)
+            rows = cursor.rowcount
+        load_manifest.record_csv_committed(
+            conn,
+            job.start_date,
+            job.end_date,
+            csv_name,
+            rows,
+            checksum,
+            date_type=job.date_type,
         )
+    dt = time.monotonic() - t0
+
+    metrics.add(copied_rows=rows, copied_bytes=member.file_size, copy_seconds=dt)
+    logger.info(
+        "committed %s rows=%s bytes=%s elapsed=%.3fs rows/s=%.0f bytes/s=%.0f",
+        csv_name,
+        rows,
+        member.file_size,
+        dt,
+        rows / dt if dt else 0.0,
+        member.file_size / dt if dt else 0.0,
+    )
 
-        t0 = time.monotonic()
-        r = requests.post(
-            AWARDS_DL_EP, json=payload_dict, headers=USER_AGENT, timeout=60
+
+def load_csv_chunk(
+    chunk: CsvChunk,
+    columns: list[str],
+    csv_name: str,
+    job: DownloadJob,
+    checksum: str,
+    metrics: SeedRunMetrics,
+    use_staging: bool = False,
+    dedupe: bool = False,
+) -> int:
+    """COPY a chunk of a CSV and record it in load_manifest in one transaction.
+
+    returns int rows copied.
+    """
+    t0 = time.monotonic()
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        with copy_target(conn, csv_name, use_staging, dedupe, metrics) as target:
+            copy_cmd = generate_copy_from_sql(csv_name, columns=columns, target=target)
+            cursor.copy_expert(copy_cmd, BytesIO(chunk.data))
+            rows = cursor.rowcount
+        load_manifest.record_csv_committed(
+            conn,
+            job.start_date,
+            job.end_date,
+            csv_name,
+            rows,
+            checksum,
+            chunk_start=chunk.start,
+            chunk_end=chunk.end,
+            date_type=job.date_type,
         )
-        dt = time.monotonic() - t0
+    dt = time.monotonic() - t0
 
-        logger.info(
-            "POST response status=%s elapsed=%.3fs content_type=%s",
-            r.status_code,
-            dt,
-            r.headers.get("content-type"),
+    metrics.add(copied_rows=rows, copied_bytes=len(chunk.data), copy_seconds=dt)
+    logger.info(
+        "committed %s bytes %s-%s rows=%s elapsed=%.3fs rows/s=%.0f bytes/s=%.0f",
+        csv_name,
+        chunk.start,
+        chunk.end,
+        rows,
+        dt,
+        rows / dt if dt else 0.0,
+        len(chunk.data) / dt if dt else 0.0,
+    )
+    return rows
+
+
+def load_csv_member_chunked(
+    zip_ref: ZipFile,
+    member: ZipInfo,
+    job: DownloadJob,
+    checksum: str,
+    metrics: SeedRunMetrics,
+    copy_executor: Executor,
+    chunk_size: int,
+    chunk_slots: threading.Semaphore,
+    use_staging: bool = False,
+    dedupe: bool = False,
+) -> None:
+    """Split a large CSV member into chunks and COPY them in parallel.
+
+    The calling thread decompresses the member and cuts it into chunks at
+    record boundaries; copy_executor copies the chunks into the same table.
+    Chunks already in load_manifest are skipped, so an interrupted file resumes
+    where it stopped as long as chunk_size is unchanged.
+
+    args
+        zip_ref: ZipFile open bulk download archive.
+        member: ZipInfo CSV member to copy.
+        job: DownloadJob the archive was downloaded for.
+        checksum: str sha256 hex digest of the archive.
+        metrics: SeedRunMetrics shared run metrics.
+        copy_executor: Executor runs load_csv_chunk. Must not be the executor
+            running this function.
+        chunk_size: int minimum bytes per chunk, see iter_csv_chunks.
+        chunk_slots: threading.Semaphore one slot per chunk held in memory
+            until it is copied. Share one across the run so memory stays
+            bounded however many members are chunked at once.
+        use_staging: bool see copy_target.
+        dedupe: bool see copy_target.
+
+    raises
+        ValueError if an earlier run chunked the file with a different
+        chunk_size.
+    """
+    csv_name = os.path.basename(member.filename)
+    with engine.connect() as conn:
+        loaded = load_manifest.get_committed_chunks(
+            conn, job.start_date, job.end_date, csv_name, job.date_type
+        )
+
+    futures = []
+    with zip_ref.open(member) as stream:
+        reader = CsvHeaderReader(stream)
+        logger.info(f"chunking {csv_name} columns: {reader.columns}")
+
+        for chunk in iter_csv_chunks(reader, chunk_size):
+            if (chunk.start, chunk.end) in loaded:
+                logger.info(f"skipping loaded chunk {csv_name} {chunk.start}")
+                continue
+            if any(start < chunk.end and chunk.start < end for start, end in loaded):
+                raise ValueError(
+                    f"{csv_name} was split into different chunks by an earlier run, "
+                    "rerun with the same chunk size"
+                )
+            if any(f.done() and f.exception() for f in futures):
+                break
+            chunk_slots.acquire()
+            future = copy_executor.submit(
+                load_csv_chunk,
+                chunk,
+                reader.columns,
+                csv_name,
+                job,
+                checksum,
+                metrics,
+                use_staging,
+                dedupe,
+            )
+            future.add_done_callback(lambda _: chunk_slots.release())
+            futures.append(future)
+
+    wait(futures)
+    rows = sum(f.result() for f in futures) + sum(loaded.values())
+    with engine.begin() as conn:
+        load_manifest.record_csv_committed(
+            conn,
+            job.start_date,
+            job.end_date,
+            csv_name,
+            rows,
+            checksum,
+            date_type=job.date_type,
+        )
+    logger.info(f"committed {csv_name} rows={rows} in {len(futures)} new chunks")
+
+
+def submit_job(
+    session: requests.Session, payload: seed_helpers_schemas.AwardsPayload
+) -> DownloadJob:
+    """Submit payload to USAs and record the job in load_manifest."""
+    j = submit_download(session, payload)
+    start_date = date.fromisoformat(payload.filters.date_range.start_date)
+    end_date = date.fromisoformat(payload.filters.date_range.end_date)
+    with engine.begin() as conn:
+        unit_id = load_manifest.record_submitted(
+            conn,
+            start_date,
+            end_date,
+            j["status_url"],
+            j["file_url"],
+            payload.filters.date_type,
         )
+    return DownloadJob(payload, unit_id, j["status_url"], j["file_url"])
+
+
+def prepare_job(
+    session: requests.Session,
+    payload: seed_helpers_schemas.AwardsPayload,
+    resume: bool = True,
+) -> Optional[DownloadJob]:
+    """Get the bulk download job for payload, submitting one if needed.
+
+    args
+        session: requests.Session shared HTTP session.
+        payload: seed_helpers_schemas.AwardsPayload download request.
+        resume: bool consult load_manifest. If False a new job is always
+            submitted.
 
-        if not r.ok:
-            logger.error("POST error body=%s", r.text[:2000])
-            r.raise_for_status()
+    returns Optional[DownloadJob] None if load_manifest shows payload was
+    already loaded. An in-flight job from an earlier run is reused instead of
+    being resubmitted. last_modified_date payloads are never skipped: the same
+    range can hold more transactions on a later run, e.g. when
+    seed_since_last_run runs twice in a day, so a loaded one is downloaded
+    again and only CSVs that changed are reloaded, see load_download.
+    """
+    if resume:
+        start_date = date.fromisoformat(payload.filters.date_range.start_date)
+        end_date = date.fromisoformat(payload.filters.date_range.end_date)
+        with engine.connect() as conn:
+            unit = load_manifest.get_payload_unit(
+                conn, start_date, end_date, payload.filters.date_type
+            )
+        if unit is not None and unit.state == load_manifest.COMMITTED:
+            if payload.filters.date_type != "last_modified_date":
+                logger.info(f"skipping loaded payload {start_date} - {end_date}")
+                return None
+            logger.info(f"downloading loaded payload {start_date} - {end_date} again")
+        elif unit is not None and unit.status_url:
+            logger.info(
+                f"resuming job for {start_date} - {end_date}: {unit.status_url}"
+            )
+            return DownloadJob(
+                payload, unit.id, unit.status_url, unit.file_url, resumed=True
+            )
+    return submit_job(session, payload)
 
-        j = r.json()
-        logger.info("POST json keys=%s", sorted(j.keys()))
 
-        logger.info(f"date_range: {payload.filters.date_range}")
-        logger.info(f"file_url: {j.get('file_url')}")
-        logger.info(f"status_url: {j.get('status_url')}")
+def load_download(
+    session: requests.Session,
+    job: DownloadJob,
+    metrics: SeedRunMetrics,
+    copy_executor: Executor,
+    extract: bool = True,
+    resume: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_slots: Optional[threading.Semaphore] = None,
+    use_staging: bool = False,
+    dedupe: bool = False,
+) -> None:
+    """Download a finished bulk download job and COPY its CSVs to the db.
 
-        status_url = j["status_url"]
-        file_url = j["file_url"]
+    The archive's CSVs are handed to copy_executor so separate files load in
+    parallel. CSVs larger than chunk_size are split into chunks that are also
+    copied in parallel. Each CSV or chunk is committed together with its
+    load_manifest row, so a rerun skips whatever was already loaded from the
+    same archive. CSVs loaded from a different archive, e.g. before the job
+    was resubmitted, are loaded again with dedupe so their rows replace the
+    earlier ones.
 
-        status = get_status(status_url)
-        logger.info("Entering poll loop")
+    args
+        session: requests.Session shared HTTP session.
+        job: DownloadJob yielded by poll_jobs.
+        metrics: SeedRunMetrics shared run metrics.
+        copy_executor: Executor runs load_csv_member. Its worker count caps the
+            number of db connections copying at once.
+        extract: bool see awards_usas_to_sql. Chunked CSVs are never extracted.
+        resume: bool skip CSVs load_manifest shows were already loaded.
+        chunk_size: int CSVs larger than this are chunked. 0 disables chunking.
+        chunk_slots: Optional[threading.Semaphore] see
+            load_csv_member_chunked. Defaults to DEFAULT_COPY_WORKERS slots
+            for this download alone.
+        use_staging: bool see copy_target.
+        dedupe: bool see copy_target.
+    """
+    if chunk_slots is None:
+        chunk_slots = threading.BoundedSemaphore(DEFAULT_COPY_WORKERS)
+    archive, checksum = download_zip(session, job.file_url, metrics)
+    with archive:
+        with engine.begin() as conn:
+            stale = load_manifest.supersede_stale_csvs(
+                conn, job.start_date, job.end_date, checksum, job.date_type
+            )
+            if stale:
+                logger.warning(
+                    f"archive changed since {sorted(set(stale))} were loaded, "
+                    f"loading them again: {job.file_url}"
+                )
+                dedupe = True
+            load_manifest.record_downloaded(conn, job.unit_id, checksum)
+            loaded = (
+                load_manifest.get_committed_csvs(
+                    conn, job.start_date, job.end_date, job.date_type
+                )
+                if resume
+                else set()
+            )
 
-        while status not in ("failed", "finished"):
-            logger.info(f"status={status}; sleeping 30s")
-            sleep(30)
-            status = get_status(status_url)
+        with ZipFile(
+            archive, "r"
+        ) as zip_ref, tempfile.TemporaryDirectory() as raw_data:
+            members = get_csv_members(zip_ref)
+            logger.info(f"csv files: {[m.filename for m in members]}")
+
+            futures = []
+            chunked = []
+            for member in members:
+                if os.path.basename(member.filename) in loaded:
+                    logger.info(f"skipping loaded csv {member.filename}")
+                    continue
+                if chunk_size and member.file_size > chunk_size:
+                    chunked.append(member)
+                    continue
+                futures.append(
+                    copy_executor.submit(
+                        load_csv_member,
+                        zip_ref,
+                        member,
+                        job,
+                        checksum,
+                        metrics,
+                        raw_data if extract else None,
+                        use_staging,
+                        dedupe,
+                    )
+                )
+            # large members are read here and their chunks handed to the pool.
+            try:
+                for member in chunked:
+                    load_csv_member_chunked(
+                        zip_ref,
+                        member,
+                        job,
+                        checksum,
+                        metrics,
+                        copy_executor,
+                        chunk_size,
+                        chunk_slots,
+                        use_staging,
+                        dedupe,
+                    )
+            finally:
+                # the archive must stay open until every member is copied.
+                wait(futures)
+            for future in futures:
+                future.result()
+
+    with engine.begin() as conn:
+        load_manifest.record_payload_committed(conn, job.unit_id)
+
+
+def awards_usas_to_sql(
+    start_date: str,
+    end_date: Optional[str] = None,
+    selected_cols: Optional[list[str]] = None,
+    extract: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    policy: Optional[PollPolicy] = None,
+    resume: bool = True,
+    copy_workers: int = DEFAULT_COPY_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_staging: bool = False,
+    dedupe: bool = False,
+    date_type: seed_helpers_schemas.DateType = "action_date",
+):
+    """Download prime award transactions from USAs and COPY them to the db.
 
-        if status == "failed":
-            raise RuntimeError("download failed")
+    All payloads are submitted up front. The jobs are then all polled, and
+    each is queued for download as soon as its file is ready, see run_jobs.
+    Up to max_workers jobs are downloaded and copied at once.
+    Progress is checkpointed in load_manifest: rerunning the same date range
+    skips payloads and CSVs that were already loaded and resumes USAs jobs that
+    were still in flight.
 
-        logger.info(f"Downloading zip: {file_url}")
-        file = requests.get(file_url, stream=True, timeout=300)
-        file.raise_for_status()
+    Year partitions of the raw tables are created for the whole date range
+    before anything is loaded. Transactions selected by last_modified_date can
+    have any action_date, so their partitions are created as they are merged.
 
-        with tempfile.TemporaryDirectory() as raw_data:
-            logger.info(f"tempdir: {raw_data}")
-            with ZipFile(BytesIO(file.content), "r") as zip_ref:
-                zip_ref.extractall(raw_data)
+    args
+        start_date: str YYYY-MM-DD earliest date_type date to download.
+        end_date: Optional[str] YYYY-MM-DD last date_type date to download.
+        selected_cols: Optional[list[str]] USAs columns to request.
+        extract: bool extract each CSV to a temp dir before COPY. If False,
+            CSV members are streamed from the archive straight into COPY.
+        max_workers: int maximum number of jobs downloaded and copied
+            concurrently.
+        policy: Optional[PollPolicy] status polling policy. Defaults to
+            PollPolicy().
+        resume: bool skip work recorded as done in load_manifest. If False
+            every payload is submitted and loaded again.
+        copy_workers: int maximum number of CSV files copied concurrently,
+            across all jobs. Each copy holds one db connection, so this should
+            not exceed the engine pool size plus overflow.
+        chunk_size: int CSVs larger than this many bytes are split into
+            chunks copied in parallel. 0 disables chunking.
+        use_staging: bool copy each CSV into an unlogged staging table, then
+            insert it into its table with one INSERT ... SELECT.
+        dedupe: bool upsert each staged CSV into its table on the transaction
+            unique key instead, keeping the row with the newest
+            last_modified_date. Makes reloading overlapping date ranges safe.
+        date_type: seed_helpers_schemas.DateType date the range filters on.
+            last_modified_date downloads may hold transactions that are
+            already loaded, so they are always loaded with dedupe.
 
-            files = glob("*.csv", root_dir=raw_data)
-            logger.info(f"csv files: {files}")
+    raises
+        RuntimeError if any job failed. Jobs that succeeded remain committed.
+    """
+    payloads = get_awards_payloads(
+        start_date, end_date, columns=selected_cols, date_type=date_type
+    )
+    logger.info("Starting seed run")
+    logger.info(f"payload count: {len(payloads)}")
+    logger.info(
+        f"payload filter date ranges: {[p.filters.date_range for p in payloads]}"
+    )
 
-            for csv_name in files:
-                with open(
-                    f"{raw_data}/{csv_name}", "r", encoding="utf-8", newline=""
-                ) as f:
-                    reader = csv.reader(f)
-                    header = next(reader)
-                    f.seek(0)
+    if date_type == "action_date":
+        with engine.begin() as conn:
+            years = partitions.get_years(
+                min(
+                    date.fromisoformat(p.filters.date_range.start_date)
+                    for p in payloads
+                ),
+                max(
+                    date.fromisoformat(p.filters.date_range.end_date) for p in payloads
+                ),
+            )
+            for table in (AssistanceTransactions, ProcurementTransactions):
+                partitions.ensure_partitions(conn, table.__tablename__, years)
+    else:
+        dedupe = True
 
-                    copy_cmd = generate_copy_from_sql(csv_name, columns=header)
-                    logger.info(f"copy_cmd for {csv_name}: {copy_cmd}")
+    if policy is None:
+        policy = PollPolicy()
+    metrics = SeedRunMetrics()
+    # chunks held in memory across all downloads, one per copy worker.
+    chunk_slots = threading.BoundedSemaphore(copy_workers)
+    with create_session(max_workers) as session:
+        # submit everything first so USAs queues all jobs while we wait.
+        jobs = [
+            job
+            for job in (prepare_job(session, p, resume) for p in payloads)
+            if job is not None
+        ]
 
-                    cursor.copy_expert(copy_cmd, f)
-                    conn.commit()
-                    logger.info(f"committed {csv_name}")
+        with ThreadPoolExecutor(
+            max_workers=copy_workers, thread_name_prefix="copy"
+        ) as copy_executor, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = run_jobs(
+                session,
+                jobs,
+                policy,
+                metrics,
+                executor,
+                lambda job: load_download(
+                    session,
+                    job,
+                    metrics,
+                    copy_executor,
+                    extract,
+                    resume,
+                    chunk_size,
+                    chunk_slots,
+                    use_staging,
+                    dedupe,
+                ),
+            )
+
+    metrics.log()
+    if errors:
+        raise RuntimeError(f"{len(errors)} of {len(jobs)} download jobs failed")
+
+
+def get_last_modified_watermark(conn) -> Optional[date]:
+    """Get the latest last_modified_date in the raw tables.
+
+    returns Optional[date] None if nothing was loaded yet.
+    """
+    dates = [
+        conn.execute(select(func.max(table.last_modified_date))).scalar()
+        for table in (AssistanceTransactions, ProcurementTransactions)
+    ]
+    return max((d for d in dates if d is not None), default=None)
+
+
+def seed_since_last_run(end_date: Optional[str] = None, **kwargs) -> None:
+    """Load transactions modified since the last run, then merge them into
+    transactions.
+
+    Transactions modified on or after the latest last_modified_date already
+    loaded are downloaded and upserted into the raw tables, see
+    awards_usas_to_sql dedupe. The watermark day is downloaded again, since
+    it may not have been complete when it was last loaded.
+
+    args
+        end_date: Optional[str] YYYY-MM-DD last last_modified_date to
+            download, defaults to today.
+        kwargs: other awards_usas_to_sql arguments.
+
+    raises
+        ValueError if nothing was loaded yet.
+    """
+    with engine.connect() as conn:
+        since = get_last_modified_watermark(conn)
+    if since is None:
+        raise ValueError("no transactions loaded yet, seed a date range first")
+    logger.info(f"loading transactions modified since {since}")
+    awards_usas_to_sql(
+        since.isoformat(), end_date, date_type="last_modified_date", **kwargs
+    )
+    seed_transactions_table.seed_transactions_table(incremental=True)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Download all prime award transaction data from USAspending within specified date range"
     )
-    parser.add_argument(
+    start = parser.add_mutually_exclusive_group(required=True)
+    start.add_argument(
         "-s",
         metavar="start_date",
         type=str,
-        help="YYYY-MM-DD Filter transactions by action_date >= (required).",
-        required=True,
+        help="YYYY-MM-DD Filter transactions by action_date >=.",
+    )
+    start.add_argument(
+        "--since-last-run",
+        action="store_true",
+        help="Load transactions by last_modified_date, from the latest one already loaded, then merge them into transactions.",
     )
     parser.add_argument(
         "-e",
         metavar="end_date",
         type=str,
-        help="YYYY-MM-DD Filter transactions by action_date <= (default = today).",
+        help="YYYY-MM-DD Filter transactions by action_date, or last_modified_date with --since-last-run, <= (default = today).",
         required=False,
     )
     parser.add_argument(
@@ -172,8 +1078,105 @@ if __name__ == "__main__":
         required=False,
         help="Comma-separated list of USAspending columns to request (optional). Example: action_date,awarding_agency_name,cfda_number",
     )
+    parser.add_argument(
+        "--no-extract",
+        action="store_true",
+        help="Stream CSV members from the downloaded zip straight into COPY instead of extracting them to a temp dir first.",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum number of download jobs polled, downloaded and copied at once (default = {DEFAULT_MAX_WORKERS}).",
+    )
+    parser.add_argument(
+        "--copy-workers",
+        type=int,
+        default=DEFAULT_COPY_WORKERS,
+        help=f"Maximum number of CSV files copied at once, each over its own db connection (default = {DEFAULT_COPY_WORKERS}).",
+    )
+    parser.add_argument(
+        "--chunk-mb",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+        help=f"Split CSV files larger than this many MiB into chunks copied in parallel, 0 to disable (default = {DEFAULT_CHUNK_SIZE // (1024 * 1024)}). Resume an interrupted run with the same value.",
+    )
+    poll_defaults = PollPolicy()
+    parser.add_argument(
+        "--poll-initial",
+        type=float,
+        default=poll_defaults.initial_interval,
+        help=f"Seconds between the first status polls (default = {poll_defaults.initial_interval}).",
+    )
+    parser.add_argument(
+        "--poll-max",
+        type=float,
+        default=poll_defaults.max_interval,
+        help=f"Maximum seconds between status polls (default = {poll_defaults.max_interval}).",
+    )
+    parser.add_argument(
+        "--poll-multiplier",
+        type=float,
+        default=poll_defaults.multiplier,
+        help=f"Growth factor of the wait between status polls (default = {poll_defaults.multiplier}).",
+    )
+    parser.add_argument(
+        "--poll-jitter",
+        type=float,
+        default=poll_defaults.jitter,
+        help=f"Fraction of each wait randomly added or removed (default = {poll_defaults.jitter}).",
+    )
+    parser.add_argument(
+        "--poll-deadline",
+        type=float,
+        default=poll_defaults.deadline,
+        help=f"Seconds to wait for a download job before giving up (default = {poll_defaults.deadline:.0f}).",
+    )
+    parser.add_argument(
+        "--poll-retries",
+        type=int,
+        default=poll_defaults.max_retries,
+        help=f"Retries of a status request after a timeout or 5xx response (default = {poll_defaults.max_retries}).",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore load_manifest and download and load every payload again.",
+    )
+    parser.add_argument(
+        "--stage",
+        "--fast-ingest",
+        action="store_true",
+        help="Copy each CSV into an unlogged staging table with synchronous_commit off, then insert it into its table with one INSERT ... SELECT.",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Stage each CSV, then upsert it on the transaction unique key, keeping the row with the newest last_modified_date. Use when reloading date ranges that were already loaded.",
+    )
     args = parser.parse_args()
     selected_cols = None
     if args.cols:
         selected_cols = [c.strip() for c in args.cols.split(",") if c.strip()]
-    awards_usas_to_sql(args.s, args.e, selected_cols)
+    kwargs = dict(
+        selected_cols=selected_cols,
+        extract=not args.no_extract,
+        max_workers=args.max_workers,
+        policy=PollPolicy(
+            initial_interval=args.poll_initial,
+            multiplier=args.poll_multiplier,
+            max_interval=args.poll_max,
+            jitter=args.poll_jitter,
+            deadline=args.poll_deadline,
+            max_retries=args.poll_retries,
+        ),
+        resume=not args.no_resume,
+        copy_workers=args.copy_workers,
+        chunk_size=args.chunk_mb * 1024 * 1024,
+        use_staging=args.stage,
+        dedupe=args.dedupe,
+    )
+    if args.since_last_run:
+        seed_since_last_run(args.e, **kwargs)
+    else:
+        awards_usas_to_sql(args.s, args.e, **kwargs)
@@ -1,3 +1,7 @@
+import csv
+import random
+import requests
+from dataclasses import dataclass
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 from typing import Literal, get_args, Tuple, Dict, List, Type, Optional
@@ -9,7 +13,8 @@ from awardsreport.models import (
     TransactionsMixin,
 )
 from awardsreport.schemas import seed_helpers_schemas
-from typing import Any
+from typing import Any, Callable, IO, Iterator, NamedTuple
+from zipfile import ZipFile, ZipInfo
 
 
 USER_AGENT = {"User-Agent": "Mozilla/5.0"}
@@ -38,6 +43,11 @@ PRIME_AWARD_TYPES = [
     "11",
 ]
 AWARDS_DL_EP = "https://api.usaspending.gov/api/v2/bulk_download/awards/"
+# column identifying a transaction across loads, per raw table.
+UNIQUE_KEYS = {
+    AssistanceTransactions: "assistance_transaction_unique_key",
+    ProcurementTransactions: "contract_transaction_unique_key",
+}
 
 
 def get_raw_columns(
@@ -118,6 +128,7 @@ def get_awards_payloads(
     start_date: str,
     end_date: Optional[str] = None,
     columns: Optional[list[str]] = None,
+    date_type: seed_helpers_schemas.DateType = "action_date",
 ) -> list[seed_helpers_schemas.AwardsPayload]:
     """Generate payloads for USAs awards download from start_date to end_date.
 
@@ -126,6 +137,9 @@ def get_awards_payloads(
     args
         start_date: Earliest date in range format as YYYY-MM-DD.
         end_date: Last date in range format as YYYY-MM-DD.
+        columns: Optional[list[str]] USAs columns to request, defaults to all
+            raw columns.
+        date_type: seed_helpers_schemas.DateType date the range filters on.
 
     returns list[seed_helpers_schemas.AwardsPayload]for api/v2/bulk_downloads/awards/
     """
@@ -148,7 +162,7 @@ def get_awards_payloads(
             columns=requested_columns,
             filters=seed_helpers_schemas.AwardsPayloadFilters(
                 prime_award_types=PRIME_AWARD_TYPES,
-                date_type="action_date",
+                date_type=date_type,
                 date_range=seed_helpers_schemas.AwardsPayloadFilterDateRange(
                     start_date=start_date,
                     end_date=end_date,
@@ -161,10 +175,34 @@ def get_awards_payloads(
     return payloads
 
 
+def get_table_for_fname(
+    fname: str,
+) -> Type[AssistanceTransactions] | Type[ProcurementTransactions]:
+    """Get the table a USAs bulk download CSV is loaded into.
+
+    args
+        fname str file name of the CSV.
+
+    returns AssistanceTransactions if fname contains 'Assistance',
+    ProcurementTransactions if fname contains 'Contract'.
+
+    raises
+        ValueError if fname does not include 'Assistance' or 'Contract'
+    """
+    if "Assistance" in fname:
+        return AssistanceTransactions
+    elif "Contract" in fname:
+        return ProcurementTransactions
+    raise ValueError(
+        f"invalid fname: {fname}. fname must include substring 'Assistance' or 'Contract'"
+    )
+
+
 def generate_copy_from_sql(
     fname: str,
     test_cols: Dict[str, List[str]] | None = None,
     columns: list[str] | None = None,
+    target: str | None = None,
 ) -> str:
     """Generate sql COPY FROM command to insert to psql.
 
@@ -176,6 +214,8 @@ def generate_copy_from_sql(
         test_cols TestColsType COPY columns to simplify testing. Users should
         not need to interact with this parameter.
         columns optional explicit column list in CSV order
+        target optional table to COPY into instead of the table matching
+        fname, e.g. a staging table.
 
     return str valid postgresql COPY FROM statement to insert data from fname
     to appropriate table.
@@ -184,16 +224,9 @@ def generate_copy_from_sql(
         ValueError if provided test_col keys are not exactly 'asst_cols' and 'proc_cols'.
         ValueError if fname does not include 'Assistance' or 'Contract'
     """
-    if "Assistance" in fname:
-        table_name = "assistance_transactions"
-        default_cols = get_raw_columns(AssistanceTransactions)
-    elif "Contract" in fname:
-        table_name = "procurement_transactions"
-        default_cols = get_raw_columns(ProcurementTransactions)
-    else:
-        raise ValueError(
-            f"invalid fname: {fname}. fname must include substring 'Assistance' or 'Contract'"
-        )
+    table = get_table_for_fname(fname)
+    table_name = table.__tablename__
+    default_cols = get_raw_columns(table)
 
     if test_cols:
         valid_keys = {"asst_cols", "proc_cols"}
@@ -213,4 +246,204 @@ def generate_copy_from_sql(
         cols_list = default_cols
 
     cols = ", ".join(cols_list)
-    return f"COPY {table_name}({cols}) FROM STDIN WITH (FORMAT CSV, HEADER)"
+    return f"COPY {target or table_name}({cols}) FROM STDIN WITH (FORMAT CSV, HEADER)"
+
+
+def get_csv_members(zip_ref: ZipFile) -> list[ZipInfo]:
+    """Get the CSV members of a USAs bulk download archive.
+
+    Directories and non-CSV members (e.g. data dictionaries) are skipped.
+
+    args
+        zip_ref: ZipFile open bulk download archive.
+
+    returns list[ZipInfo] CSV members in archive order.
+    """
+    return [
+        member
+        for member in zip_ref.infolist()
+        if not member.is_dir() and member.filename.lower().endswith(".csv")
+    ]
+
+
+class CsvHeaderReader:
+    """Binary file-like wrapper that parses the header row of a CSV stream.
+
+    The header line is read eagerly so the column list is available before the
+    stream is handed to cursor.copy_expert. The header bytes are replayed on the
+    first read, so the wrapped stream can still be copied WITH (HEADER).
+
+    args
+        stream: IO[bytes] CSV stream, e.g. from ZipFile.open().
+        encoding: str encoding used to decode the header row.
+    """
+
+    def __init__(self, stream: IO[bytes], encoding: str = "utf-8-sig"):
+        self._stream = stream
+        self._header = stream.readline()
+        self.columns: list[str] = next(csv.reader([self._header.decode(encoding)]), [])
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._header:
+            return self._stream.read(size)
+        header, self._header = self._header, b""
+        if size is None or size < 0:
+            return header + self._stream.read()
+        if len(header) >= size:
+            self._header = header[size:]
+            return header[:size]
+        return header + self._stream.read(size - len(header))
+
+    def readline(self, size: int = -1) -> bytes:
+        if not self._header:
+            return self._stream.readline(size)
+        header, self._header = self._header, b""
+        return header
+
+
+@dataclass
+class PollPolicy:
+    """Wait times for polling USAs bulk download status.
+
+    Polls start fast so small downloads are picked up quickly, then back off
+    exponentially up to max_interval. The same backoff is used between retries
+    of transient HTTP errors.
+
+    attributes
+        initial_interval: float seconds before the second poll.
+        multiplier: float growth factor applied per poll.
+        max_interval: float cap on seconds between polls.
+        jitter: float fraction of each interval randomly added or removed so
+            concurrent workers don't poll in lockstep.
+        deadline: float seconds after which a job is given up on.
+        max_retries: int transient errors tolerated per status request.
+        request_timeout: float seconds before a status request times out.
+    """
+
+    initial_interval: float = 2.0
+    multiplier: float = 2.0
+    max_interval: float = 60.0
+    jitter: float = 0.1
+    deadline: float = 4 * 60 * 60
+    max_retries: int = 5
+    request_timeout: float = 60.0
+
+    def interval(
+        self, attempt: int, rand: Callable[[], float] = random.random
+    ) -> float:
+        """Seconds to wait before poll or retry number attempt + 1.
+
+        args
+            attempt: int zero based number of waits so far.
+            rand: Callable[[], float] returns a float in [0, 1).
+
+        returns float seconds to wait.
+        """
+        # stop multiplying at max_interval: multiplier**attempt overflows a
+        # float after about a thousand polls.
+        base = self.initial_interval
+        for _ in range(attempt):
+            if base >= self.max_interval:
+                break
+            base *= self.multiplier
+        base = min(base, self.max_interval)
+        return max(0.0, base * (1 + self.jitter * (2 * rand() - 1)))
+
+
+def is_transient_error(e: BaseException) -> bool:
+    """Return True if e is an HTTP error worth retrying.
+
+    Timeouts, connection errors and 5xx responses are transient. 4xx responses
+    are not.
+    """
+    if isinstance(e, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return e.response.status_code >= 500
+    return False
+
+
+class CsvChunk(NamedTuple):
+    """A run of whole CSV records, prefixed with the CSV header row.
+
+    start and end are byte offsets of the records in the source stream, so a
+    chunk can be identified again when the same file is chunked on a rerun.
+    """
+
+    start: int
+    end: int
+    data: bytes
+
+
+def _last_record_end(data: bytearray, start: int, in_quotes: bool) -> tuple[int, bool]:
+    """Find the last record boundary in data[start:].
+
+    A record ends at a newline that is not inside a quoted field. Escaped
+    quotes ("") toggle the quote state twice, so counting quotes is enough.
+
+    args
+        data: bytearray CSV bytes.
+        start: int index to start scanning from.
+        in_quotes: bool whether data[start] is inside a quoted field.
+
+    returns tuple[int, bool] index just past the last record boundary, or -1 if
+    there is none, and whether the end of data is inside a quoted field.
+    """
+    record_end = -1
+    pos = start
+    while pos < len(data):
+        quote = data.find(b'"', pos)
+        stop = len(data) if quote == -1 else quote
+        if not in_quotes:
+            newline = data.rfind(b"\n", pos, stop)
+            if newline != -1:
+                record_end = newline + 1
+        if quote == -1:
+            break
+        in_quotes = not in_quotes
+        pos = quote + 1
+    return record_end, in_quotes
+
+
+def iter_csv_chunks(
+    stream: IO[bytes], chunk_size: int, read_size: int = 1024 * 1024
+) -> Iterator[CsvChunk]:
+    """Split a CSV stream into chunks that can be copied independently.
+
+    Once at least chunk_size bytes are buffered, a chunk is cut at the last
+    record boundary in the buffer, so quoted fields containing newlines are
+    never split. Every chunk starts with the header row so it can be copied
+    WITH (HEADER). At most about chunk_size + read_size bytes are buffered.
+
+    args
+        stream: IO[bytes] CSV stream positioned at the header row.
+        chunk_size: int minimum bytes of records per chunk, except the last.
+        read_size: int bytes read from stream at a time.
+
+    returns Iterator[CsvChunk]
+    """
+    header = stream.readline()
+    offset = len(header)
+    buf = bytearray()
+    in_quotes = False
+    record_end = -1
+    while True:
+        block = stream.read(read_size)
+        if block:
+            scan_from = len(buf)
+            buf += block
+            end, in_quotes = _last_record_end(buf, scan_from, in_quotes)
+            if end != -1:
+                record_end = end
+            if len(buf) < chunk_size or record_end == -1:
+                continue
+            cut = record_end
+        elif buf:
+            cut = len(buf)
+        else:
+            return
+        yield CsvChunk(offset, offset + cut, header + bytes(buf[:cut]))
+        offset += cut
+        del buf[:cut]
+        # the rest of buf starts on a record boundary, so in_quotes still holds.
+        record_end = -1
@@ -1,54 +1,391 @@
-from sqlalchemy import select, column, union_all, literal_column
-from awardsreport.database import sess, Base
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from sqlalchemy import (
+    Connection,
+    MetaData,
+    Select,
+    cast,
+    exists,
+    func,
+    insert,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Type
+
+from awardsreport.logging_setup import setup_logging
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
+from awardsreport.database import engine
+from awardsreport.logic import data_version
 from awardsreport.models import (
-    TransactionsMixin,
     AssistanceTransactions,
-    TransactionDerivationsMixin,
     ProcurementTransactions,
-    ProcurementTransactionsMixin,
-    AssistanceTransactionsMixin,
+    Transactions,
+    TransactionsWatermark,
+)
+from awardsreport.setup import (
+    maintenance,
+    partitions,
+    rollups,
+    staging,
+    table_swap,
 )
+from awardsreport.setup.seed_helpers import UNIQUE_KEYS
+
+# transactions columns filled from the raw tables, in table order.
+TX_COLS = [c for c in Transactions.__table__.c.keys() if c != "id"]
+# year partitions populated at once by a rebuild.
+DEFAULT_WORKERS = 4
+
+
+def get_source_select(
+    table: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+) -> Select:
+    """Select a raw table's rows as transactions columns.
+
+    Columns that only exist on the other raw table are selected as NULL, cast
+    to the transactions column type so the select also works as a subquery.
+
+    args
+        table: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+
+    returns sqlalchemy.Select with one labeled column per TX_COLS entry.
+    """
+    src_cols = table.__table__.c
+    tx_cols = Transactions.__table__.c
+    return select(
+        *[
+            src_cols[c] if c in src_cols else cast(null(), tx_cols[c].type).label(c)
+            for c in TX_COLS
+        ]
+    )
+
+
+def get_watermark(conn: Connection, source: str) -> int:
+    """Get the highest id of source already merged into transactions.
+
+    returns int last_id, 0 if source was never merged.
+    """
+    last_id = conn.execute(
+        select(TransactionsWatermark.last_id).where(
+            TransactionsWatermark.source == source
+        )
+    ).scalar()
+    return last_id or 0
 
 
-def get_tx_cols_none(mixin=None):
-    mixin_cols = [col for col in mixin.__annotations__.keys()]
-    return [literal_column("NULL").label(col) for col in mixin_cols]
+def set_watermark(conn: Connection, source: str, last_id: int) -> None:
+    stmt = pg_insert(TransactionsWatermark).values(source=source, last_id=last_id)
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[TransactionsWatermark.source],
+            set_=dict(last_id=stmt.excluded.last_id, updated_at=func.now()),
+        )
+    )
+
+
+def get_latest_new_rows(
+    table: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    after_id: int,
+    through_id: int,
+):
+    """Subquery of raw rows loaded since the watermark, one per unique key.
+
+    When a transaction was loaded more than once since the watermark, only the
+    row with the latest last_modified_date is kept. Rows without a unique key
+    are all kept.
+
+    args
+        table: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+        after_id: int watermark, rows with a greater id are new.
+        through_id: int highest id to include, so rows loaded after it was
+            read are left for the next merge.
+
+    returns sqlalchemy.Subquery with TX_COLS columns.
+    """
+    key = getattr(table, UNIQUE_KEYS[table])
+    ranked = (
+        get_source_select(table)
+        .add_columns(
+            func.row_number()
+            .over(
+                partition_by=key,
+                order_by=(
+                    table.last_modified_date.desc().nulls_last(),
+                    table.id.desc(),
+                ),
+            )
+            .label("rn")
+        )
+        .where(table.id > after_id, table.id <= through_id)
+        .subquery()
+    )
+    return (
+        select(*[ranked.c[c] for c in TX_COLS])
+        .where(or_(ranked.c.rn == 1, ranked.c[UNIQUE_KEYS[table]].is_(None)))
+        .subquery("latest")
+    )
+
+
+def get_source_years(conn: Connection) -> set[int]:
+    """Get the action_date years spanned by the raw tables.
+
+    returns set[int] years transactions needs partitions for.
+    """
+    years: set[int] = set()
+    for table in UNIQUE_KEYS:
+        start, end = conn.execute(
+            select(func.min(table.action_date), func.max(table.action_date))
+        ).one()
+        if start is not None:
+            years.update(partitions.get_years(start, end))
+    return years
 
 
-tx_mixin_cols = [column(col) for col in TransactionsMixin.__annotations__.keys()]
-tx_deriv_cols = [
-    column(col) for col in TransactionDerivationsMixin.__annotations__.keys()
-]
-tx_proc_mixin_cols = [
-    column(col) for col in ProcurementTransactionsMixin.__annotations__.keys()
-]
-tx_asst_mixin_cols = [
-    column(col) for col in AssistanceTransactionsMixin.__annotations__.keys()
-]
+def merge_source(
+    conn: Connection,
+    table: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+) -> tuple[int, int]:
+    """Merge raw rows loaded since the watermark into transactions.
+
+    Transactions whose unique key already exists are updated if the loaded
+    last_modified_date is newer; the rest are appended. The watermark is
+    moved in the same transaction. Loads into table are locked out until the
+    transaction ends, see staging.lock_raw_table, so ids are only read up to
+    committed loads: a load still committing lower ids would otherwise be
+    skipped by the watermark.
+
+    args
+        conn: Connection with an open transaction.
+        table: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+
+    returns tuple[int, int] rows (updated, inserted).
+    """
+    source = table.__tablename__
+    staging.lock_raw_table(conn, table)
+    after_id = get_watermark(conn, source)
+    through_id = conn.execute(select(func.max(table.id))).scalar()
+    if through_id is None or through_id <= after_id:
+        logger.info(f"no new rows in {source} after id {after_id}")
+        return 0, 0
+
+    partitions.ensure_partitions(
+        conn, Transactions.__tablename__, get_source_years(conn)
+    )
+    key = UNIQUE_KEYS[table]
+    latest = get_latest_new_rows(table, after_id, through_id)
+    updated = conn.execute(
+        update(Transactions)
+        .where(
+            Transactions.__table__.c[key] == latest.c[key],
+            latest.c.last_modified_date > Transactions.last_modified_date,
+        )
+        .values({c: latest.c[c] for c in TX_COLS})
+    ).rowcount
+    inserted = conn.execute(
+        insert(Transactions).from_select(
+            TX_COLS,
+            select(latest).where(
+                ~exists().where(Transactions.__table__.c[key] == latest.c[key])
+            ),
+        )
+    ).rowcount
+    set_watermark(conn, source, through_id)
+    logger.info(
+        f"merged {source} ids {after_id + 1}-{through_id}: "
+        f"updated={updated} inserted={inserted}"
+    )
+    return updated, inserted
+
+
+def populate_year(
+    shadow: str,
+    year: int,
+    through_ids: dict[
+        Type[AssistanceTransactions] | Type[ProcurementTransactions], int
+    ],
+) -> tuple[int, float]:
+    """Insert one year of raw rows straight into a shadow partition.
+
+    Runs in its own transaction on its own connection so years can be
+    populated in parallel.
+
+    args
+        shadow: str partitioned shadow table from create_shadow_table.
+        year: int action_date year to copy.
+        through_ids: dict highest id of each raw table to copy.
+
+    returns tuple[int, float] rows inserted and seconds taken.
+    """
+    t0 = time.monotonic()
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    partition = Transactions.__table__.to_metadata(
+        MetaData(), name=partitions.partition_name(shadow, year)
+    )
+    sel = union_all(
+        *[
+            get_source_select(table).where(
+                table.action_date >= start,
+                table.action_date < end,
+                table.id <= through_id,
+            )
+            for table, through_id in through_ids.items()
+        ]
+    )
+    with engine.begin() as conn:
+        rows = conn.execute(insert(partition).from_select(TX_COLS, sel)).rowcount
+    return rows, time.monotonic() - t0
+
+
+def rebuild_transactions(workers: int = DEFAULT_WORKERS) -> int:
+    """Rebuild transactions from every raw row without blocking readers.
+
+    The rows are inserted into a shadow table, one INSERT ... SELECT per year
+    partition spread over workers connections. The shadow is then indexed and
+    analyzed before being swapped in with renames in a short transaction of
+    its own. Queries keep reading the old table until the swap commits.
+    Watermarks are set in the swap transaction so later runs can be
+    incremental. The rollups are then rebuilt from the new table and swapped
+    in the same way, after which the old table can be dropped and the data
+    version bumped.
+
+    args
+        workers: int year partitions populated at once. Each holds one db
+            connection.
+
+    returns int rows inserted.
+    """
+    table_name = Transactions.__tablename__
+    with engine.begin() as conn:
+        # only up to committed loads, see merge_source.
+        for table in UNIQUE_KEYS:
+            staging.lock_raw_table(conn, table)
+        through_ids = {
+            table: conn.execute(select(func.max(table.id))).scalar() or 0
+            for table in UNIQUE_KEYS
+        }
+        source_years = get_source_years(conn)
+        shadow = table_swap.create_shadow_table(conn, table_name)
+        partitions.ensure_partitions(
+            conn,
+            shadow,
+            source_years | set(partitions.get_partition_years(conn, table_name)),
+        )
+
+    inserted = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(populate_year, shadow, year, through_ids): year
+            for year in sorted(source_years)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            rows, dt = future.result()
+            inserted += rows
+            logger.info(
+                "populated %s year %s rows=%s elapsed=%.3fs (%s/%s years)",
+                shadow,
+                futures[future],
+                rows,
+                dt,
+                done,
+                len(futures),
+            )
+
+    with engine.begin() as conn:
+        t0 = time.monotonic()
+        table_swap.build_shadow_indexes(conn, table_name, shadow)
+        conn.execute(text(f"ANALYZE {shadow}"))
+        logger.info("indexed %s elapsed=%.3fs", shadow, time.monotonic() - t0)
+
+    with engine.begin() as conn:
+        old = table_swap.swap_tables(conn, table_name, shadow)
+        for table, through_id in through_ids.items():
+            set_watermark(conn, table.__tablename__, through_id)
+    with engine.begin() as conn:
+        rollups.build_new_rollups(conn)
+    with engine.begin() as conn:
+        rollups.swap_new_rollups(conn)
+        table_swap.drop_old_table(conn, old)
+        data_version.bump_data_version(conn)
+    return inserted
+
+
+def seed_transactions_table(
+    incremental: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    defer_indexes: bool = False,
+) -> None:
+    """Build transactions from assistance_transactions and
+    procurement_transactions.
+
+    args
+        incremental: bool only merge raw rows loaded since the last build,
+            instead of rebuilding the whole table, see rebuild_transactions.
+        workers: int see rebuild_transactions.
+        defer_indexes: bool for incremental builds, drop the secondary indexes
+            of transactions before merging and rebuild them afterwards with
+            maintenance.run_maintenance. The unique key indexes the merge
+            looks rows up by are kept. Faster for large merges; summary
+            tables not served by a rollup are slower until the rebuild.
+    """
+    t0 = time.monotonic()
+    updated, inserted = 0, 0
+    if incremental:
+        if defer_indexes:
+            # in its own transaction: DROP INDEX locks out readers until commit.
+            with engine.begin() as conn:
+                maintenance.drop_secondary_indexes(conn, Transactions)
+        with engine.begin() as conn:
+            for table in UNIQUE_KEYS:
+                u, i = merge_source(conn, table)
+                updated, inserted = updated + u, inserted + i
+        if defer_indexes:
+            maintenance.run_maintenance([Transactions], workers=workers)
+        rollups.refresh_rollups()
+    else:
+        inserted = rebuild_transactions(workers)
+    logger.info(
+        "transactions built updated=%s inserted=%s elapsed=%.3fs",
+        updated,
+        inserted,
+        time.monotonic() - t0,
+    )
 
 
 if __name__ == "__main__":
-    session = sess()
-
-    asst_tx_sel = select(
-        *tx_mixin_cols,
-        *tx_deriv_cols,
-        *get_tx_cols_none(ProcurementTransactionsMixin),
-        *tx_asst_mixin_cols,
-    ).select_from(AssistanceTransactions)
-
-    proc_tx_sel = select(
-        *tx_mixin_cols,
-        *tx_deriv_cols,
-        *tx_proc_mixin_cols,
-        *get_tx_cols_none(AssistanceTransactionsMixin),
-    ).select_from(ProcurementTransactions)
-
-    sel = asst_tx_sel.union_all(proc_tx_sel)
-    session.execute(
-        Base.metadata.tables["transactions"].insert()
-        # the last column in transactions is id, it should not be inserted.
-        .from_select(Base.metadata.tables["transactions"].c.keys()[:-1], sel)
-    )
-    session.commit()
+    parser = argparse.ArgumentParser(
+        description="Populate transactions from assistance_transactions and procurement_transactions"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only merge raw rows loaded since the last run, updating transactions whose last_modified_date changed.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Year partitions populated at once during a rebuild, each over its own db connection (default = {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument(
+        "--defer-indexes",
+        action="store_true",
+        help="With --incremental, drop the secondary indexes of transactions before merging, then rebuild them, VACUUM and ANALYZE.",
+    )
+    args = parser.parse_args()
+    seed_transactions_table(
+        incremental=args.incremental,
+        workers=args.workers,
+        defer_indexes=args.defer_indexes,
+    )
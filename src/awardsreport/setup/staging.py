@@ -0,0 +1,259 @@
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from sqlalchemy import (
+    Connection,
+    Insert,
+    Integer,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    text,
+    update,
+)
+from typing import Iterator, Optional, Type
+from uuid import uuid4
+
+from awardsreport.models import AssistanceTransactions, ProcurementTransactions
+from awardsreport.setup import partitions
+from awardsreport.setup.seed_helpers import UNIQUE_KEYS, get_raw_columns
+
+logger = logging.getLogger(__name__)
+
+# settings applied with SET LOCAL to transactions that load through a staging
+# table. With synchronous_commit off a crash can lose the last few commits,
+# but each CSV's rows and its load_manifest row are lost together, so the
+# next run copies that CSV again.
+FAST_INGEST_SETTINGS = {"synchronous_commit": "off"}
+
+
+def set_fast_ingest(conn: Connection) -> None:
+    """Apply FAST_INGEST_SETTINGS until conn's transaction ends."""
+    for name, value in FAST_INGEST_SETTINGS.items():
+        conn.execute(text(f"SET LOCAL {name} = '{value}'"))
+
+
+def create_staging_table_sql(
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    staging_name: str,
+) -> str:
+    """Generate sql creating an empty unlogged copy of target's raw columns.
+
+    The staging table has no id, generated columns, constraints or indexes,
+    so COPY into it only writes the raw rows and skips the WAL.
+
+    args
+        target: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+        staging_name: str name of the staging table.
+
+    returns str CREATE UNLOGGED TABLE statement.
+    """
+    cols = ", ".join(get_raw_columns(target))
+    return (
+        f"CREATE UNLOGGED TABLE {staging_name} AS "
+        f"SELECT {cols} FROM {target.__tablename__} WITH NO DATA"
+    )
+
+
+def insert_from_staging(
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    staging_name: str,
+) -> Insert:
+    """Insert staged rows into target in a single pass.
+
+    The database computes target's generated columns as the rows are inserted.
+
+    args
+        target: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+        staging_name: str name of a table created by create_staging_table_sql.
+
+    returns sqlalchemy.Insert INSERT ... SELECT from the staging table.
+    """
+    raw_cols = get_raw_columns(target)
+    staged = table(staging_name, *[column(c) for c in raw_cols])
+    return insert(target).from_select(raw_cols, select(*staged.c))
+
+
+def lock_raw_table(
+    conn: Connection,
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    shared: bool = False,
+) -> None:
+    """Take target's transaction scoped advisory lock until conn's transaction
+    ends.
+
+    Loads that only append to target take it shared so they can run in
+    parallel. merge_from_staging takes it exclusive, and so does
+    seed_transactions_table before reading a raw table's highest id, so
+    every id it reads up to belongs to a committed load.
+
+    args
+        conn: Connection with an open transaction.
+        target: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+        shared: bool take the lock shared instead of exclusive.
+    """
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    conn.execute(select(lock(func.hashtext(target.__tablename__))))
+
+
+@dataclass
+class MergeCounts:
+    """Outcome of merging a staging table, in staged rows."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # staged rows dropped by dedupe_staging for a newer row of the same key.
+    duplicates: int = 0
+
+
+def dedupe_staging(
+    conn: Connection,
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    staging_name: str,
+) -> int:
+    """Delete all but the newest staged row of each transaction unique key.
+
+    The row with the latest last_modified_date is kept. Rows without a unique
+    key are all kept.
+
+    returns int rows deleted.
+    """
+    key = UNIQUE_KEYS[target]
+    ctid = literal_column("ctid")
+    staged = table(staging_name, column(key), column("last_modified_date"))
+    ranked = (
+        select(
+            ctid.label("row_ctid"),
+            func.row_number()
+            .over(
+                partition_by=staged.c[key],
+                order_by=staged.c.last_modified_date.desc().nulls_last(),
+            )
+            .label("rn"),
+        )
+        .where(staged.c[key].is_not(None))
+        .subquery()
+    )
+    return conn.execute(
+        delete(staged).where(ctid.in_(select(ranked.c.row_ctid).where(ranked.c.rn > 1)))
+    ).rowcount
+
+
+def merge_from_staging(
+    conn: Connection,
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    staging_name: str,
+) -> MergeCounts:
+    """Upsert staged rows into target on the transaction unique key.
+
+    Staged duplicates are collapsed with dedupe_staging first. Rows of target
+    with a staged unique key are replaced when the staged last_modified_date
+    is newer, and take a new id so seed_transactions_table's incremental
+    merge, which reads rows past an id watermark, picks the change up. Staged
+    rows with a new or NULL unique key are inserted; the rest are left
+    alone. Merges into the same table are serialized with lock_raw_table, so
+    parallel loads of overlapping data cannot insert the same key twice.
+    Missing year partitions of target are created under the same lock.
+
+    args
+        conn: Connection with an open transaction.
+        target: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+        staging_name: str name of a table created by create_staging_table_sql.
+
+    returns MergeCounts
+    """
+    key = UNIQUE_KEYS[target]
+    raw_cols = get_raw_columns(target)
+    staged = table(staging_name, *[column(c) for c in raw_cols])
+    target_key = target.__table__.c[key]
+    duplicates = dedupe_staging(conn, target, staging_name)
+    total = conn.execute(select(func.count()).select_from(staged)).scalar_one()
+
+    lock_raw_table(conn, target)
+    partitions.ensure_partitions(
+        conn,
+        target.__tablename__,
+        conn.execute(
+            select(func.extract("year", staged.c.action_date).cast(Integer))
+            .where(staged.c.action_date.is_not(None))
+            .distinct()
+        ).scalars(),
+    )
+    updated_keys = (
+        update(target)
+        .where(
+            target_key == staged.c[key],
+            staged.c.last_modified_date > target.last_modified_date,
+        )
+        .values(
+            {
+                **{c: staged.c[c] for c in raw_cols},
+                "id": func.nextval(
+                    func.pg_get_serial_sequence(target.__tablename__, "id")
+                ),
+            }
+        )
+        .returning(target_key)
+        .cte("updated_keys")
+    )
+    updated = conn.execute(
+        select(func.count(updated_keys.c[key].distinct()))
+    ).scalar_one()
+    inserted = conn.execute(
+        insert(target).from_select(
+            raw_cols,
+            select(*staged.c).where(~exists().where(target_key == staged.c[key])),
+        )
+    ).rowcount
+    return MergeCounts(
+        inserted=inserted,
+        updated=updated,
+        unchanged=total - inserted - updated,
+        duplicates=duplicates,
+    )
+
+
+@contextmanager
+def staging_table(
+    conn: Connection,
+    target: Type[AssistanceTransactions] | Type[ProcurementTransactions],
+    merge_counts: Optional[MergeCounts] = None,
+) -> Iterator[str]:
+    """Create a staging table for target and merge it into target on exit.
+
+    The staging table is created, filled, merged and dropped inside the
+    caller's transaction, so a failed load leaves nothing behind. Each call
+    uses a unique name so loads can run in parallel. FAST_INGEST_SETTINGS are
+    applied to the transaction.
+
+    args
+        conn: Connection with an open transaction.
+        target: Type[AssistanceTransactions] | Type[ProcurementTransactions]
+            table the staged rows are inserted into.
+        merge_counts: Optional[MergeCounts] if given, staged rows are upserted
+            on their unique key with merge_from_staging and the outcome is
+            added to merge_counts. Otherwise every staged row is appended.
+
+    yields str name of the staging table to COPY into.
+    """
+    staging_name = f"{target.__tablename__}_staging_{uuid4().hex[:12]}"
+    set_fast_ingest(conn)
+    conn.execute(text(create_staging_table_sql(target, staging_name)))
+    yield staging_name
+    if merge_counts is None:
+        lock_raw_table(conn, target, shared=True)
+        conn.execute(insert_from_staging(target, staging_name))
+    else:
+        counts = merge_from_staging(conn, target, staging_name)
+        logger.info(f"merged {staging_name} into {target.__tablename__}: {counts}")
+        merge_counts.inserted += counts.inserted
+        merge_counts.updated += counts.updated
+        merge_counts.unchanged += counts.unchanged
+        merge_counts.duplicates += counts.duplicates
+    conn.execute(text(f"DROP TABLE {staging_name}"))
@@ -0,0 +1,195 @@
+import logging
+from sqlalchemy import Connection, text
+
+from awardsreport.setup.partitions import get_partition_key, get_partitions
+
+logger = logging.getLogger(__name__)
+
+# seconds the swap waits for readers to release the live table before failing.
+SWAP_LOCK_TIMEOUT = 10
+
+
+def _renamed(name: str, suffix: str) -> str:
+    """Append suffix to an identifier, keeping it within postgres' 63 bytes."""
+    return f"{name[:63 - len(suffix)]}{suffix}"
+
+
+def shadow_name(table_name: str) -> str:
+    return _renamed(table_name, "_shadow")
+
+
+def create_shadow_table(conn: Connection, table_name: str) -> str:
+    """Create an empty copy of table_name without its indexes.
+
+    Columns, defaults (including the id sequence) and generated columns are
+    copied. Indexes and constraints are added by build_shadow_indexes after
+    the shadow is loaded. A shadow left behind by a failed run is dropped.
+
+    If table_name is partitioned the shadow is partitioned the same way, but
+    has no partitions until the caller creates them.
+
+    args
+        conn: Connection
+        table_name: str live table to copy.
+
+    returns str name of the shadow table.
+    """
+    shadow = shadow_name(table_name)
+    partition_key = get_partition_key(conn, table_name)
+    partition_by = f" PARTITION BY {partition_key}" if partition_key else ""
+    conn.execute(text(f"DROP TABLE IF EXISTS {shadow}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {shadow} (LIKE {table_name} "
+            f"INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE){partition_by}"
+        )
+    )
+    return shadow
+
+
+def get_index_ddl(conn: Connection, table_name: str) -> dict[str, str]:
+    """Get the definitions of table_name's indexes that do not back a
+    constraint.
+
+    returns dict[str, str] CREATE INDEX statement keyed by index name.
+    """
+    rows = conn.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = CAST(:table_name AS regclass)
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint k WHERE k.conindid = i.indexrelid
+            )
+            """
+        ),
+        dict(table_name=table_name),
+    )
+    return {name: ddl for name, ddl in rows}
+
+
+def get_constraint_ddl(conn: Connection, table_name: str) -> dict[str, str]:
+    """Get the definitions of table_name's primary key and unique constraints.
+
+    returns dict[str, str] constraint definition, e.g. 'PRIMARY KEY (id)',
+    keyed by constraint name.
+    """
+    rows = conn.execute(
+        text(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = CAST(:table_name AS regclass) AND contype IN ('p', 'u')
+            """
+        ),
+        dict(table_name=table_name),
+    )
+    return {name: ddl for name, ddl in rows}
+
+
+def build_shadow_indexes(conn: Connection, table_name: str, shadow: str) -> None:
+    """Recreate table_name's constraints and indexes on its loaded shadow.
+
+    The shadow's copies are named with a '_new' suffix until swap_tables
+    gives them the live names.
+    """
+    for name, ddl in get_constraint_ddl(conn, table_name).items():
+        logger.info(f"adding {name} to {shadow}")
+        conn.execute(
+            text(f"ALTER TABLE {shadow} ADD CONSTRAINT {_renamed(name, '_new')} {ddl}")
+        )
+    for name, ddl in get_index_ddl(conn, table_name).items():
+        logger.info(f"building {name} on {shadow}")
+        head, _, tail = ddl.partition(" ON ")
+        head = head.replace(f"INDEX {name}", f"INDEX {_renamed(name, '_new')}", 1)
+        # tail starts with the schema qualified table name, preceded by ONLY
+        # for partitioned tables. The shadow's index must cover its partitions.
+        tail = tail.removeprefix("ONLY ").split(" ", 1)[1]
+        conn.execute(text(f"{head} ON {shadow} {tail}"))
+
+
+def _rename_partitions(
+    conn: Connection, partitions: list[str], prefix: str, new_prefix: str
+) -> None:
+    """Rename partitions, and their indexes, named after a parent table."""
+    for name in partitions:
+        if not name.startswith(prefix):
+            continue
+        for index in conn.execute(
+            text(
+                """
+                SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE i.indrelid = CAST(:name AS regclass)
+                """
+            ),
+            dict(name=name),
+        ).scalars():
+            if index.startswith(prefix):
+                renamed = _renamed(new_prefix + index[len(prefix) :], "")
+                conn.execute(text(f"ALTER INDEX {index} RENAME TO {renamed}"))
+        conn.execute(
+            text(f"ALTER TABLE {name} RENAME TO {new_prefix}{name[len(prefix):]}")
+        )
+
+
+def swap_tables(conn: Connection, table_name: str, shadow: str) -> str:
+    """Replace table_name with its shadow.
+
+    Only renames run here, so execute in a short transaction of its own; the
+    live table stays readable until this commits. Indexes, constraints and
+    partitions named after either table are renamed so the new table ends up
+    with the live names, and the id sequence is handed to the new table.
+
+    args
+        conn: Connection with an open transaction.
+        table_name: str live table.
+        shadow: str loaded and indexed shadow from create_shadow_table.
+
+    returns str name the replaced table was renamed to. Drop it with
+    drop_old_table once the swap is committed.
+    """
+    old = _renamed(table_name, "_old")
+    conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}s'"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence(:table_name, 'id')"),
+        dict(table_name=table_name),
+    ).scalar()
+    constraints = get_constraint_ddl(conn, table_name)
+    indexes = get_index_ddl(conn, table_name)
+    live_partitions = get_partitions(conn, table_name)
+    shadow_partitions = get_partitions(conn, shadow)
+
+    conn.execute(text(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {table_name} RENAME TO {old}"))
+    for name in constraints:
+        conn.execute(
+            text(
+                f"ALTER TABLE {old} RENAME CONSTRAINT {name} TO {_renamed(name, '_old')}"
+            )
+        )
+    for name in indexes:
+        conn.execute(text(f"ALTER INDEX {name} RENAME TO {_renamed(name, '_old')}"))
+    _rename_partitions(conn, live_partitions, table_name, old)
+
+    conn.execute(text(f"ALTER TABLE {shadow} RENAME TO {table_name}"))
+    for name in constraints:
+        conn.execute(
+            text(
+                f"ALTER TABLE {table_name} RENAME CONSTRAINT {_renamed(name, '_new')} TO {name}"
+            )
+        )
+    for name in indexes:
+        conn.execute(text(f"ALTER INDEX {_renamed(name, '_new')} RENAME TO {name}"))
+    _rename_partitions(conn, shadow_partitions, shadow, table_name)
+    if sequence:
+        # otherwise dropping the old table would drop the sequence with it.
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table_name}.id"))
+    logger.info(f"swapped {shadow} in as {table_name}")
+    return old
+
+
+def drop_old_table(conn: Connection, old: str) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
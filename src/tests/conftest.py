@@ -16,6 +16,13 @@ def setup_database(alembic_config):
     yield
 
 
+@pytest.fixture
+def conn(setup_database):
+    with engine.connect() as conn:
+        yield conn
+        conn.rollback()
+
+
 @pytest.fixture(autouse=True)
 def db_session(setup_database):
     pass
@@ -109,7 +109,6 @@ class AssistanceTransactionsFactory(
     TransactionsMixinFactory,
     AssistanceTransactionsMixinFactory,
     HasIdFactory,
-    TransactionDerivationsMixinFactory,
 ):
     class Meta:
         model = AssistanceTransactions
@@ -119,7 +118,6 @@ class ProcurementTransactionsFactory(
     TransactionsMixinFactory,
     ProcurementTransactionsMixinFactory,
     HasIdFactory,
-    TransactionDerivationsMixinFactory,
 ):
     class Meta:
         model = ProcurementTransactions
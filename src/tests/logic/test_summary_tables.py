@@ -1,10 +1,12 @@
+from awardsreport.database import engine
 from awardsreport.logic import summary_tables
 from awardsreport.main import app
 from awardsreport.models import Transactions as T
 from awardsreport.schemas import summary_tables_schemas
 from fastapi.testclient import TestClient
 from pydantic import ValidationError
-from sqlalchemy import and_, true
+from datetime import date
+from sqlalchemy import and_, false, insert, or_, text, true
 from typing import get_args
 import pytest
 
@@ -181,7 +183,9 @@ def test_create_filter_statement_y():
         y=[2022, 2023]
     )
     results = summary_tables.create_filter_statement(filter_statement_schema)
-    expected_results = and_(true, T.action_date_year.in_([2022, 2023]))
+    expected_results = and_(
+        true, T.action_date.between(date(2022, 1, 1), date(2023, 12, 31))
+    )
     assert results.compare(expected_results)
 
 
@@ -190,5 +194,164 @@ def test_create_filter_statement_ym():
         ym=["2023-01", "2023-02"]
     )
     results = summary_tables.create_filter_statement(filter_statement_schema)
-    expected_results = and_(true, T.action_date_year_month.in_(["2023-01", "2023-02"]))
+    expected_results = and_(
+        true, T.action_date.between(date(2023, 1, 1), date(2023, 2, 28))
+    )
+    assert results.compare(expected_results)
+
+
+def test_create_filter_statement_ym_invalid():
+    for ym in ["2023-13", "2023-1", "202301", "0000-01"]:
+        with pytest.raises(ValidationError):
+            summary_tables_schemas.FilterStatementSchema(ym=[ym])
+
+
+def test_create_filter_statement_y_invalid():
+    for y in [0, 10000]:
+        with pytest.raises(ValidationError):
+            summary_tables_schemas.FilterStatementSchema(y=[y])
+
+
+def test_create_filter_statement_date_bounds():
+    filter_statement_schema = summary_tables_schemas.FilterStatementSchema(
+        y=[1, 9999], ym=["0001-01", "9999-12"]
+    )
+    results = summary_tables.create_filter_statement(filter_statement_schema)
+    expected_results = and_(
+        true,
+        or_(
+            T.action_date.between(date(1, 1, 1), date(1, 1, 31)),
+            T.action_date.between(date(9999, 12, 1), date(9999, 12, 31)),
+        ),
+    )
+    assert results.compare(expected_results)
+
+
+def test_create_filter_statement_start_date_invalid():
+    with pytest.raises(ValidationError):
+        summary_tables_schemas.FilterStatementSchema(start_date="2023-02-30")
+
+
+def test_create_filter_statement_y_ym_dates():
+    filter_statement_schema = summary_tables_schemas.FilterStatementSchema(
+        y=[2021, 2023],
+        ym=["2021-12", "2022-01", "2023-03", "2023-05"],
+        start_date="2021-12-15",
+    )
+    results = summary_tables.create_filter_statement(filter_statement_schema)
+    expected_results = and_(
+        true,
+        or_(
+            T.action_date.between(date(2021, 12, 15), date(2021, 12, 31)),
+            T.action_date.between(date(2023, 3, 1), date(2023, 3, 31)),
+            T.action_date.between(date(2023, 5, 1), date(2023, 5, 31)),
+        ),
+    )
     assert results.compare(expected_results)
+
+
+def test_create_filter_statement_y_no_overlap():
+    filter_statement_schema = summary_tables_schemas.FilterStatementSchema(
+        y=[2022], end_date="2021-12-31"
+    )
+    results = summary_tables.create_filter_statement(filter_statement_schema)
+    assert results.compare(and_(true, false()))
+
+
+def test_merge_date_ranges():
+    results = summary_tables.merge_date_ranges(
+        [
+            (date(2023, 3, 1), date(2023, 3, 31)),
+            (date(2023, 1, 1), date(2023, 1, 31)),
+            (date(2023, 2, 1), date(2023, 2, 28)),
+            (date(2023, 1, 15), date(2023, 1, 20)),
+            (date(2023, 5, 1), date(2023, 5, 31)),
+        ]
+    )
+    expected_results = [
+        (date(2023, 1, 1), date(2023, 3, 31)),
+        (date(2023, 5, 1), date(2023, 5, 31)),
+    ]
+    assert results == expected_results
+
+
+def test_year_month_ranges():
+    results = summary_tables.year_month_ranges(["2024-02", "2023-12", "2024-01"])
+    assert results == [(date(2023, 12, 1), date(2024, 2, 29))]
+
+
+def test_year_month_ranges_bounds():
+    results = summary_tables.year_month_ranges(["9999-12", "0001-01", "9999-11"])
+    assert results == [
+        (date(1, 1, 1), date(1, 1, 31)),
+        (date(9999, 11, 1), date.max),
+    ]
+
+
+def test_select_rollup():
+    def select(gb, **filters):
+        rollup = summary_tables.select_rollup(
+            summary_tables_schemas.GroupByStatementSchema(gb=gb),
+            summary_tables_schemas.FilterStatementSchema(**filters),
+        )
+        return rollup.name if rollup else None
+
+    assert select(["y"]) == "rollup_ym"
+    assert select(["awag", "ym"], y=[2023]) == "rollup_awag"
+    assert select(["naics"], awag=["097"]) == "rollup_awag_naics"
+    assert select(["awag"], start_date="2023-01-01", end_date="2023-03-31") == (
+        "rollup_awag"
+    )
+    # day level dates, and keys no rollup has, need transactions.
+    assert select(["awag"], start_date="2023-01-15") is None
+    assert select(["uei"]) is None
+    assert select(["awag"], cfda=["10.001"], naics=["111110"]) is None
+
+
+def test_create_summary_table_statement_rollup():
+    gb = summary_tables_schemas.GroupByStatementSchema(gb=["awag", "ym"])
+    filters = summary_tables_schemas.FilterStatementSchema(
+        awag=["097", "012"], start_date="2023-01-01", end_date="2023-02-28"
+    )
+    limit = summary_tables_schemas.LimitStatementSchema()
+    with engine.connect() as conn:
+        conn.execute(
+            insert(T),
+            [
+                dict(
+                    action_date=date(2023, month, day),
+                    action_date_year=2023,
+                    action_date_year_month=f"2023-{month:02d}",
+                    awarding_agency_code=code,
+                    awarding_agency_name=name,
+                    generated_pragmatic_obligations=obligations,
+                )
+                for month, day, code, name, obligations in (
+                    (1, 5, "097", "DOD", 10.0),
+                    (1, 20, "097", "DOD", 5.0),
+                    (2, 1, "097", "DOD", 1.0),
+                    (2, 3, "012", "USDA", 7.0),
+                    (3, 1, "097", "DOD", 100.0),
+                    (1, 9, "075", "HHS", 50.0),
+                )
+            ],
+        )
+        conn.execute(text("REFRESH MATERIALIZED VIEW rollup_awag"))
+        stmt = summary_tables.create_summary_table_statement(gb, filters, limit)
+        assert "FROM rollup_awag" in str(stmt)
+        results = conn.execute(stmt).all()
+        expected = conn.execute(
+            summary_tables.create_group_by_sum_filter_limit_statement(
+                gb, filters, limit
+            )
+        ).all()
+        conn.rollback()
+    assert (
+        results
+        == expected
+        == [
+            ("DOD", "2023-01", 15.0),
+            ("USDA", "2023-02", 7.0),
+            ("DOD", "2023-02", 1.0),
+        ]
+    )
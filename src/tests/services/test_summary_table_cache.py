@@ -0,0 +1,252 @@
+from awardsreport.services import summary_table_cache
+from awardsreport.schemas import summary_tables_schemas
+from awardsreport.logic import data_version
+from awardsreport.services.data_version_listener import DataVersionListener
+from awardsreport.models import SummaryTableCacheEntry
+from awardsreport.database import async_engine, engine
+from awardsreport.routers import summary_tables
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.orm import Session
+import asyncio
+import json
+import pytest
+import queue
+
+
+def create_key(gb, limit=None, **filters):
+    return summary_table_cache.create_cache_key(
+        summary_tables_schemas.GroupByStatementSchema(gb=gb),
+        summary_tables_schemas.FilterStatementSchema(**filters),
+        summary_tables_schemas.LimitStatementSchema(limit=limit),
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def get_or_compute(cache, key, compute, get_version):
+    async def compute_async():
+        return compute()
+
+    async def get_version_async():
+        return get_version()
+
+    return asyncio.run(cache.get_or_compute(key, compute_async, get_version_async))
+
+
+def test_create_cache_key():
+    assert create_key(["awag"], awag=["097", "012", "097"]) == create_key(
+        ["awag"], awag=["012", "097"]
+    )
+    assert create_key(["awag"], y=["2023"]) == create_key(["awag"], y=[2023])
+    assert create_key(["awag", "y"]) != create_key(["y", "awag"])
+    assert create_key(["awag"], limit=5) != create_key(["awag"])
+    assert json.loads(create_key(["awag"], awag=[], end_date="2023-01-01")) == {
+        "gb": ["awag"],
+        "filters": {"end_date": "2023-01-01"},
+        "limit": None,
+    }
+
+
+def test_get_or_compute_hit_miss(clock):
+    cache = summary_table_cache.SummaryTableCache(clock=clock)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"data": [1]}
+
+    assert get_or_compute(cache, "a", compute, lambda: 1) == {"data": [1]}
+    assert get_or_compute(cache, "a", compute, lambda: 1) == {"data": [1]}
+    assert len(computed) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == len(json.dumps({"data": [1]}))
+
+
+def test_get_or_compute_evicts_least_recently_used(clock):
+    value = {"data": "x" * 10}
+    size = len(json.dumps(value))
+    cache = summary_table_cache.SummaryTableCache(max_bytes=2 * size, clock=clock)
+    for key in ["a", "b", "a", "c"]:
+        get_or_compute(cache, key, lambda: value, lambda: 1)
+    assert cache.stats()["evictions"] == 1
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["bytes"] == 2 * size
+
+
+def test_get_or_compute_skips_oversized(clock):
+    cache = summary_table_cache.SummaryTableCache(max_bytes=5, clock=clock)
+    assert get_or_compute(cache, "a", lambda: {"data": [1]}, lambda: 1)
+    assert cache.stats()["entries"] == 0
+
+
+def test_get_or_compute_invalidates_on_version_change(clock):
+    cache = summary_table_cache.SummaryTableCache(version_check_seconds=5, clock=clock)
+    version = [1]
+    get_or_compute(cache, "a", lambda: {"v": 1}, lambda: version[0])
+    version[0] = 2
+    # version is not rechecked until version_check_seconds pass.
+    clock.now = 4
+    assert get_or_compute(cache, "a", lambda: {"v": 2}, lambda: version[0]) == {"v": 1}
+    clock.now = 5
+    assert get_or_compute(cache, "a", lambda: {"v": 2}, lambda: version[0]) == {"v": 2}
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["data_version"]) == (1, 2)
+
+
+def test_get_or_compute_skips_put_when_version_changes(clock):
+    cache = summary_table_cache.SummaryTableCache(version_check_seconds=0, clock=clock)
+    version = [1]
+
+    async def get_version():
+        return version[0]
+
+    async def compute_b():
+        return {}
+
+    async def compute_a():
+        # another request sees the new version while this one computes.
+        version[0] = 2
+        await cache.get_or_compute("b", compute_b, get_version)
+        return {"v": 1}
+
+    asyncio.run(cache.get_or_compute("a", compute_a, get_version))
+    assert list(cache._entries) == ["b"]
+
+
+def test_bump_data_version():
+    with engine.begin() as conn:
+        before = data_version.get_data_version(conn)
+        assert data_version.bump_data_version(conn) == before + 1
+        assert data_version.get_data_version(conn) == before + 1
+        conn.rollback()
+
+
+def test_shared_response():
+    with Session(engine) as db:
+        assert summary_table_cache.get_shared_response(db, "a", 1) is None
+        summary_table_cache.put_shared_response(db, "a", 1, {"v": 1})
+        assert summary_table_cache.get_shared_response(db, "a", 1) == {"v": 1}
+        # a response built from an older version does not replace a newer one.
+        summary_table_cache.put_shared_response(db, "a", 2, {"v": 2})
+        summary_table_cache.put_shared_response(db, "a", 1, {"v": 1})
+        assert summary_table_cache.get_shared_response(db, "a", 1) is None
+        assert summary_table_cache.get_shared_response(db, "a", 2) == {"v": 2}
+        db.rollback()
+
+
+def test_bump_data_version_deletes_shared_responses():
+    with Session(engine) as db:
+        version = data_version.get_data_version(db)
+        summary_table_cache.put_shared_response(db, "a", version, {})
+        data_version.bump_data_version(db.connection())
+        assert (
+            db.execute(select(func.count(SummaryTableCacheEntry.key_hash))).scalar()
+            == 0
+        )
+        db.rollback()
+
+
+def test_data_version_listener():
+    versions = queue.Queue()
+    listener = DataVersionListener(versions.put)
+    listener.start()
+    try:
+        with engine.connect() as conn:
+            before = data_version.get_data_version(conn)
+        assert versions.get(timeout=5) == before
+        with engine.begin() as conn:
+            after = data_version.bump_data_version(conn)
+        assert versions.get(timeout=5) == after
+    finally:
+        listener.stop()
+        listener.join()
+    assert after == before + 1
+
+
+def test_single_flight():
+    single_flight = summary_table_cache.SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"v": len(calls)}
+
+    async def main():
+        results = await asyncio.gather(*[single_flight.do("a", fn) for _ in range(5)])
+        # a new execution once the first is done.
+        results.append(await single_flight.do("a", fn))
+        return results
+
+    assert asyncio.run(main()) == [{"v": 1}] * 5 + [{"v": 2}]
+    assert single_flight.stats() == {"executions": 2, "coalesced": 4, "in_flight": 0}
+
+
+def test_single_flight_exception():
+    single_flight = summary_table_cache.SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def main():
+        return await asyncio.gather(
+            *[single_flight.do("a", fn) for _ in range(2)], return_exceptions=True
+        )
+
+    assert [type(r) for r in asyncio.run(main())] == [ValueError, ValueError]
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_create_summary_table_leader_cancelled(monkeypatch):
+    def create_summary_table_statement(*args):
+        # a slow query with one row, grouped by awag.
+        return select(literal("agency1"), literal(1.0)).select_from(func.pg_sleep(0.2))
+
+    monkeypatch.setattr(
+        summary_tables.summary_tables,
+        "create_summary_table_statement",
+        create_summary_table_statement,
+    )
+    monkeypatch.setattr(
+        summary_tables, "cache", summary_table_cache.SummaryTableCache()
+    )
+    monkeypatch.setattr(
+        summary_tables, "single_flight", summary_table_cache.SingleFlight()
+    )
+    schemas = (
+        summary_tables_schemas.GroupByStatementSchema(gb=["awag"]),
+        summary_tables_schemas.FilterStatementSchema(),
+        summary_tables_schemas.LimitStatementSchema(),
+    )
+
+    async def main():
+        leader = asyncio.ensure_future(summary_tables.create_summary_table(*schemas))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(summary_tables.create_summary_table(*schemas))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        try:
+            return await follower
+        finally:
+            await async_engine.dispose()
+
+    try:
+        response = asyncio.run(main())
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(SummaryTableCacheEntry))
+    assert response["data"] == [{"awag": "agency1", "obligations": 1.0}]
+    assert summary_tables.single_flight.stats()["coalesced"] == 1
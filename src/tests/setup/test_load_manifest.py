@@ -0,0 +1,87 @@
+from awardsreport.setup import load_manifest
+from datetime import date
+
+START = date(2022, 10, 1)
+END = date(2023, 9, 30)
+
+
+def test_get_payload_unit_none(conn):
+    assert load_manifest.get_payload_unit(conn, START, END) is None
+
+
+def test_record_submitted(conn):
+    unit_id = load_manifest.record_submitted(conn, START, END, "status1", "file1")
+    unit = load_manifest.get_payload_unit(conn, START, END)
+    assert (unit.id, unit.state, unit.status_url) == (
+        unit_id,
+        load_manifest.SUBMITTED,
+        "status1",
+    )
+
+    # resubmitting reuses the payload row with the new job urls.
+    load_manifest.record_downloaded(conn, unit_id, "abc")
+    assert (
+        load_manifest.record_submitted(conn, START, END, "status2", "file2") == unit_id
+    )
+    unit = load_manifest.get_payload_unit(conn, START, END)
+    assert (unit.state, unit.status_url, unit.file_checksum) == (
+        load_manifest.SUBMITTED,
+        "status2",
+        None,
+    )
+
+
+def test_get_committed_csvs(conn):
+    unit_id = load_manifest.record_submitted(conn, START, END, "status", "file")
+    load_manifest.record_csv_committed(conn, START, END, "Assistance_1.csv", 10)
+    load_manifest.record_csv_committed(conn, START, END, "Contracts_1.csv", 5)
+    load_manifest.record_csv_committed(conn, END, END, "Contracts_2.csv", 5)
+    load_manifest.record_payload_committed(conn, unit_id)
+
+    results = load_manifest.get_committed_csvs(conn, START, END)
+    assert results == {"Assistance_1.csv", "Contracts_1.csv"}
+    unit = load_manifest.get_payload_unit(conn, START, END)
+    assert unit.state == load_manifest.COMMITTED
+
+
+def test_get_committed_chunks(conn):
+    load_manifest.record_csv_committed(
+        conn, START, END, "Contracts_1.csv", 10, chunk_start=20, chunk_end=100
+    )
+    load_manifest.record_csv_committed(
+        conn, START, END, "Contracts_1.csv", 8, chunk_start=100, chunk_end=180
+    )
+
+    results = load_manifest.get_committed_chunks(conn, START, END, "Contracts_1.csv")
+    assert results == {(20, 100): 10, (100, 180): 8}
+    # chunks alone don't mark the CSV as loaded.
+    assert load_manifest.get_committed_csvs(conn, START, END) == set()
+
+
+def test_date_type(conn):
+    unit_id = load_manifest.record_submitted(conn, START, END, "status", "file")
+    load_manifest.record_csv_committed(conn, START, END, "Assistance_1.csv", 10)
+    load_manifest.record_payload_committed(conn, unit_id)
+
+    # the same dates filtered on last_modified_date are a different payload.
+    date_type = "last_modified_date"
+    assert load_manifest.get_payload_unit(conn, START, END, date_type) is None
+    assert load_manifest.get_committed_csvs(conn, START, END, date_type) == set()
+    assert (
+        load_manifest.record_submitted(conn, START, END, "status", "file", date_type)
+        != unit_id
+    )
+
+
+def test_supersede_stale_csvs(conn):
+    load_manifest.record_csv_committed(conn, START, END, "Assistance_1.csv", 10, "a")
+    load_manifest.record_csv_committed(conn, START, END, "Contracts_1.csv", 5, "b")
+    load_manifest.record_csv_committed(
+        conn, START, END, "Contracts_2.csv", 8, "a", chunk_start=20, chunk_end=100
+    )
+
+    results = load_manifest.supersede_stale_csvs(conn, START, END, "b")
+    assert sorted(results) == ["Assistance_1.csv", "Contracts_2.csv"]
+    assert load_manifest.get_committed_csvs(conn, START, END) == {"Contracts_1.csv"}
+    assert load_manifest.get_committed_chunks(conn, START, END, "Contracts_2.csv") == {}
+    assert load_manifest.supersede_stale_csvs(conn, START, END, "b") == []
@@ -0,0 +1,53 @@
+from awardsreport.database import engine
+from awardsreport.models import AssistanceTransactions, Transactions
+from awardsreport.setup import maintenance, table_swap
+from sqlalchemy import text
+
+
+def test_drop_and_build_secondary_indexes():
+    with engine.begin() as conn:
+        dropped = maintenance.drop_secondary_indexes(conn, Transactions)
+    try:
+        assert "ix_transactions_action_date_brin" in dropped
+        with engine.connect() as conn:
+            existing = table_swap.get_index_ddl(conn, "transactions")
+        for name in (
+            "ix_transactions_assistance_transaction_unique_key",
+            "ix_transactions_contract_transaction_unique_key",
+        ):
+            assert name not in dropped
+            assert name in existing
+        with engine.connect() as conn:
+            missing = maintenance.get_missing_indexes(conn, Transactions)
+        assert sorted(str(ix.name) for ix in missing) == sorted(dropped)
+    finally:
+        built = maintenance.build_missing_indexes([Transactions])
+    assert sorted(built) == sorted(dropped)
+    with engine.connect() as conn:
+        assert maintenance.get_missing_indexes(conn, Transactions) == []
+
+
+def test_create_extended_statistics(conn):
+    conn.execute(
+        text(
+            "CREATE TABLE assistance_transactions_y1999 PARTITION OF "
+            "assistance_transactions FOR VALUES FROM ('1999-01-01') TO ('2000-01-01')"
+        )
+    )
+    names = maintenance.create_extended_statistics(conn, AssistanceTransactions)
+    assert "stx_assistance_transactions_cfda" in names
+    assert "stx_assistance_transactions_y1999_cfda" in names
+    assert maintenance.create_extended_statistics(conn, AssistanceTransactions) == names
+    created = conn.execute(
+        text("SELECT stxname FROM pg_statistic_ext WHERE stxname LIKE 'stx_%'")
+    ).scalars()
+    assert set(names) <= set(created)
+
+
+def test_get_primary_key_name(conn):
+    assert maintenance.get_primary_key_name(conn, "transactions") == "transactions_pkey"
+
+
+def test_run_maintenance():
+    timings = maintenance.run_maintenance([Transactions], cluster=True)
+    assert list(timings) == ["cluster", "indexes", "statistics", "vacuum", "analyze"]
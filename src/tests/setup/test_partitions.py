@@ -0,0 +1,51 @@
+from awardsreport.setup import partitions
+from datetime import date
+from sqlalchemy import text
+import pytest
+
+
+@pytest.fixture
+def conn(conn):
+    conn.execute(
+        text(
+            "CREATE TABLE partition_test (id int, action_date date) "
+            "PARTITION BY RANGE (action_date)"
+        )
+    )
+    return conn
+
+
+def test_is_partition_name():
+    assert partitions.is_partition_name("transactions_y2023")
+    assert not partitions.is_partition_name("transactions_y2023_pkey")
+    assert not partitions.is_partition_name("transactions")
+
+
+def test_create_year_partition_sql():
+    result = partitions.create_year_partition_sql("transactions", 2023)
+    expected_result = (
+        "CREATE TABLE IF NOT EXISTS transactions_y2023 PARTITION OF transactions "
+        "FOR VALUES FROM ('2023-01-01') TO ('2024-01-01')"
+    )
+    assert result == expected_result
+
+
+def test_get_years():
+    result = partitions.get_years(date(2021, 10, 1), date(2023, 1, 1))
+    assert list(result) == [2021, 2022, 2023]
+
+
+def test_ensure_partitions(conn):
+    partitions.ensure_partitions(conn, "partition_test", [2023, 2021])
+    partitions.ensure_partitions(conn, "partition_test", [2022, 2023])
+    assert partitions.get_partitions(conn, "partition_test") == [
+        "partition_test_y2021",
+        "partition_test_y2022",
+        "partition_test_y2023",
+    ]
+    assert partitions.get_partition_years(conn, "partition_test") == [
+        2021,
+        2022,
+        2023,
+    ]
+    assert partitions.get_partition_key(conn, "partition_test") == "RANGE (action_date)"
@@ -0,0 +1,309 @@
+from awardsreport.database import engine
+from awardsreport.models import LoadManifest
+from awardsreport.setup import load_manifest, seed
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import date
+from functools import partial
+from io import BytesIO
+from sqlalchemy import delete
+from types import SimpleNamespace
+from zipfile import ZipFile
+import requests
+import threading
+import time
+import pytest
+
+JOB = SimpleNamespace(
+    start_date=date(2023, 1, 1), end_date=date(2023, 1, 31), date_type="action_date"
+)
+
+
+def create_zip(members: dict[str, str]) -> ZipFile:
+    buf = BytesIO()
+    with ZipFile(buf, "w") as zip_ref:
+        for name, content in members.items():
+            zip_ref.writestr(name, content)
+    buf.seek(0)
+    return ZipFile(buf)
+
+
+@pytest.fixture
+def no_manifest(monkeypatch):
+    monkeypatch.setattr(seed.load_manifest, "get_committed_chunks", lambda *a: {})
+    monkeypatch.setattr(
+        seed.load_manifest, "record_csv_committed", lambda *a, **kw: None
+    )
+
+
+def test_load_csv_member_chunked_shares_chunk_slots(monkeypatch, no_manifest):
+    rows = "".join(f"{i},name{i}\n" for i in range(20))
+    zip_ref = create_zip(
+        {
+            "Assistance_1.csv": "id,name\n" + rows,
+            "Contracts_1.csv": "id,name\n" + rows,
+        }
+    )
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    copied = []
+
+    def load_csv_chunk(chunk, columns, csv_name, *args):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+            copied.append(csv_name)
+        return 1
+
+    monkeypatch.setattr(seed, "load_csv_chunk", load_csv_chunk)
+    monkeypatch.setattr(
+        seed, "iter_csv_chunks", partial(seed.iter_csv_chunks, read_size=32)
+    )
+    chunk_slots = threading.BoundedSemaphore(2)
+    metrics = seed.SeedRunMetrics()
+    with ThreadPoolExecutor(8) as copy_executor, ThreadPoolExecutor(2) as executor:
+        # two downloads chunking a member each at the same time.
+        futures = [
+            executor.submit(
+                seed.load_csv_member_chunked,
+                zip_ref,
+                member,
+                JOB,
+                "checksum",
+                metrics,
+                copy_executor,
+                16,
+                chunk_slots,
+            )
+            for member in zip_ref.infolist()
+        ]
+        for future in futures:
+            future.result()
+
+    assert peak == 2
+    assert copied.count("Assistance_1.csv") == copied.count("Contracts_1.csv") > 2
+
+
+@pytest.fixture
+def manifest():
+    yield
+    with engine.begin() as conn:
+        conn.execute(delete(LoadManifest))
+
+
+def test_load_download_reloads_csvs_from_changed_archive(monkeypatch, manifest):
+    with engine.begin() as conn:
+        unit_id = load_manifest.record_submitted(
+            conn, JOB.start_date, JOB.end_date, "status", "file"
+        )
+        load_manifest.record_csv_committed(
+            conn, JOB.start_date, JOB.end_date, "Assistance_1.csv", 1, "old"
+        )
+        load_manifest.record_csv_committed(
+            conn, JOB.start_date, JOB.end_date, "Contracts_1.csv", 1, "new"
+        )
+    job = SimpleNamespace(**vars(JOB), unit_id=unit_id, status_url="s", file_url="f")
+    archive = BytesIO()
+    with ZipFile(archive, "w") as zip_ref:
+        zip_ref.writestr("Assistance_1.csv", "id\n1\n")
+        zip_ref.writestr("Contracts_1.csv", "id\n1\n")
+    archive.seek(0)
+    loaded = []
+
+    def load_csv_member(
+        zip_ref, member, job, checksum, metrics, extract_dir, use_staging, dedupe
+    ):
+        loaded.append((member.filename, checksum, dedupe))
+
+    monkeypatch.setattr(seed, "download_zip", lambda *args: (archive, "new"))
+    monkeypatch.setattr(seed, "load_csv_member", load_csv_member)
+    with ThreadPoolExecutor(1) as copy_executor:
+        seed.load_download(
+            None, job, seed.SeedRunMetrics(), copy_executor, chunk_size=0
+        )
+
+    # only the CSV loaded from the old archive is loaded again, with dedupe.
+    assert loaded == [("Assistance_1.csv", "new", True)]
+    with engine.connect() as conn:
+        assert load_manifest.get_committed_csvs(conn, JOB.start_date, JOB.end_date) == {
+            "Contracts_1.csv"
+        }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"status": self.status}
+
+
+class FakeSession:
+    """Answers status requests from a list of statuses or errors per url."""
+
+    def __init__(self, statuses: dict[str, list]):
+        self.statuses = statuses
+
+    def get(self, url, timeout=None):
+        status = self.statuses[url].pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+
+
+class ImmediateExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(seed, "time", clock)
+    monkeypatch.setattr(seed, "sleep", clock.sleep)
+    return clock
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def create_job(name, resumed=False):
+    return SimpleNamespace(
+        status_url=name, file_url=name, payload=name, resumed=resumed
+    )
+
+
+def run_jobs(statuses, jobs, load, policy=None):
+    metrics = seed.SeedRunMetrics()
+    errors = seed.run_jobs(
+        FakeSession(statuses),
+        jobs,
+        policy or seed.PollPolicy(jitter=0),
+        metrics,
+        ImmediateExecutor(),
+        load,
+    )
+    return errors, metrics
+
+
+def test_run_jobs_loads_jobs_as_they_finish(clock):
+    loaded = []
+    statuses = {
+        "a": ["running", "running", "running", "finished"],
+        "b": ["running", "finished"],
+        "c": ["finished"],
+    }
+    jobs = [create_job(name) for name in statuses]
+    errors, metrics = run_jobs(
+        statuses, jobs, lambda job: loaded.append((job.status_url, clock.now))
+    )
+    assert errors == []
+    # polled every 2, 4, 8 seconds, see PollPolicy.
+    assert loaded == [("c", 0.0), ("b", 2.0), ("a", 14.0)]
+    assert metrics.status_requests == 7
+    assert metrics.poll_wait_seconds == 14.0
+
+
+def test_run_jobs_failures_are_isolated(clock):
+    loaded = []
+
+    def load(job):
+        if job.status_url == "c":
+            raise ValueError("copy failed")
+        loaded.append(job.status_url)
+
+    statuses = {
+        "a": ["failed"],
+        "b": ["running", "finished"],
+        "c": ["finished"],
+        "d": ["running"] * 10,
+        "e": [http_error(404)],
+    }
+    jobs = [create_job(name) for name in statuses]
+    errors, _ = run_jobs(statuses, jobs, load, seed.PollPolicy(jitter=0, deadline=5))
+    assert loaded == ["b"]
+    assert sorted(type(e).__name__ for e in errors) == [
+        "HTTPError",
+        "RuntimeError",
+        "TimeoutError",
+        "ValueError",
+    ]
+
+
+def test_run_jobs_retries(clock, monkeypatch):
+    loaded = []
+    statuses = {
+        "a": [requests.ConnectionError(), "finished"],
+        "resumed": ["failed"],
+        "resubmitted": ["finished"],
+    }
+    monkeypatch.setattr(
+        seed, "submit_job", lambda session, payload: create_job("resubmitted")
+    )
+    jobs = [create_job("a"), create_job("resumed", resumed=True)]
+    errors, metrics = run_jobs(
+        statuses, jobs, lambda job: loaded.append(job.status_url)
+    )
+    assert errors == []
+    assert loaded == ["a", "resubmitted"]
+    assert metrics.status_retries == 1
+
+
+def test_prepare_job_downloads_loaded_delta_again(monkeypatch, manifest):
+    submitted = []
+
+    def submit_job(session, payload):
+        submitted.append(payload.filters.date_type)
+        return create_job("resubmitted")
+
+    monkeypatch.setattr(seed, "submit_job", submit_job)
+    for date_type in ("action_date", "last_modified_date"):
+        with engine.begin() as conn:
+            unit_id = load_manifest.record_submitted(
+                conn, JOB.start_date, JOB.start_date, "status", "file", date_type
+            )
+            load_manifest.record_payload_committed(conn, unit_id)
+
+    # seed_since_last_run run again on the day of the watermark.
+    for date_type in ("action_date", "last_modified_date"):
+        (payload,) = seed.get_awards_payloads(
+            JOB.start_date.isoformat(),
+            JOB.start_date.isoformat(),
+            date_type=date_type,
+        )
+        seed.prepare_job(None, payload)
+    assert submitted == ["last_modified_date"]
+
+    # while its job is in flight it is resumed instead.
+    with engine.begin() as conn:
+        load_manifest.record_submitted(
+            conn, JOB.start_date, JOB.start_date, "status", "file", date_type
+        )
+    assert seed.prepare_job(None, payload).resumed
+    assert submitted == ["last_modified_date"]
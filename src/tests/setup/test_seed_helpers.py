@@ -1,11 +1,15 @@
 import pytest
+import requests
 from awardsreport.setup import seed_helpers
 from awardsreport.models import (
     Transactions,
     AssistanceTransactions,
     ProcurementTransactions,
 )
+import csv
 from datetime import datetime
+from io import BytesIO
+from zipfile import ZipFile
 
 
 def test_get_raw_columns_invalid_table():
@@ -286,6 +290,16 @@ def test_generate_copy_from_sql_explicit_columns():
     )
 
 
+def test_generate_copy_from_sql_target():
+    result = seed_helpers.generate_copy_from_sql(
+        "Contract_1.csv", columns=["action_date"], target="procurement_staging"
+    )
+    assert (
+        result
+        == "COPY procurement_staging(action_date) FROM STDIN WITH (FORMAT CSV, HEADER)"
+    )
+
+
 def test_get_awards_payload_preserves_requested_column_order():
     requested_columns = [
         "recipient_name",
@@ -300,3 +314,118 @@ def test_get_awards_payload_preserves_requested_column_order():
     )
 
     assert results[0].columns == requested_columns
+
+
+def test_get_awards_payload_date_type():
+    results = seed_helpers.get_awards_payloads(
+        start_date="2023-10-01",
+        end_date="2023-10-31",
+        date_type="last_modified_date",
+    )
+
+    assert results[0].filters.date_type == "last_modified_date"
+
+
+def test_get_csv_members():
+    archive = BytesIO()
+    with ZipFile(archive, "w") as zip_ref:
+        zip_ref.writestr("FY2023_All_Assistance_Full_1.csv", "action_date\n")
+        zip_ref.writestr("FY2023_All_Contracts_Full_1.csv", "action_date\n")
+        zip_ref.writestr("Data_Dictionary_Crosswalk.xlsx", "")
+        zip_ref.writestr("nested/", "")
+    with ZipFile(archive) as zip_ref:
+        results = [m.filename for m in seed_helpers.get_csv_members(zip_ref)]
+    assert results == [
+        "FY2023_All_Assistance_Full_1.csv",
+        "FY2023_All_Contracts_Full_1.csv",
+    ]
+
+
+def test_csv_header_reader():
+    data = b'action_date,recipient_name\n2023-01-01,"multi\nline"\n'
+    reader = seed_helpers.CsvHeaderReader(BytesIO(data))
+    assert reader.columns == ["action_date", "recipient_name"]
+    # header is replayed so COPY ... WITH (HEADER) still skips it.
+    assert reader.read(5) + reader.read() == data
+
+
+def test_csv_header_reader_bom():
+    reader = seed_helpers.CsvHeaderReader(BytesIO(b"\xef\xbb\xbfaction_date\r\n"))
+    assert reader.columns == ["action_date"]
+
+
+def test_poll_policy_interval():
+    policy = seed_helpers.PollPolicy(
+        initial_interval=2, multiplier=2, max_interval=10, jitter=0
+    )
+    results = [policy.interval(attempt) for attempt in range(5)]
+    assert results == [2, 4, 8, 10, 10]
+    # long runs keep polling every max_interval.
+    assert policy.interval(5000) == 10
+
+
+def test_poll_policy_interval_jitter():
+    policy = seed_helpers.PollPolicy(initial_interval=10, jitter=0.5)
+    assert policy.interval(0, rand=lambda: 0.0) == 5
+    assert policy.interval(0, rand=lambda: 0.5) == 10
+    assert policy.interval(0, rand=lambda: 1.0) == 15
+
+
+def test_is_transient_error():
+    def http_error(status_code):
+        response = requests.Response()
+        response.status_code = status_code
+        return requests.HTTPError(response=response)
+
+    assert seed_helpers.is_transient_error(requests.Timeout())
+    assert seed_helpers.is_transient_error(requests.ConnectionError())
+    assert seed_helpers.is_transient_error(http_error(502))
+    assert not seed_helpers.is_transient_error(http_error(404))
+    assert not seed_helpers.is_transient_error(ValueError())
+
+
+def test_iter_csv_chunks():
+    header = b"id,description\n"
+    records = [
+        b'1,"multi\nline ""quoted"" text"\n',
+        b"2,plain\n",
+        b'3,"comma, and\nnewline"\n',
+        b"4,last without newline",
+    ]
+    body = b"".join(records)
+    chunks = list(
+        seed_helpers.iter_csv_chunks(BytesIO(header + body), chunk_size=10, read_size=7)
+    )
+
+    assert len(chunks) > 1
+    assert all(chunk.data.startswith(header) for chunk in chunks)
+    # chunks are contiguous and cover the whole body.
+    assert chunks[0].start == len(header)
+    assert all(a.end == b.start for a, b in zip(chunks, chunks[1:]))
+    assert b"".join(chunk.data[len(header) :] for chunk in chunks) == body
+    # every chunk holds whole records.
+    rows = [
+        row
+        for chunk in chunks
+        for row in csv.reader(chunk.data.decode().splitlines(keepends=True))
+    ]
+    assert rows == [
+        ["id", "description"],
+        ["1", 'multi\nline "quoted" text'],
+        ["id", "description"],
+        ["2", "plain"],
+        ["id", "description"],
+        ["3", "comma, and\nnewline"],
+        ["id", "description"],
+        ["4", "last without newline"],
+    ]
+
+
+def test_iter_csv_chunks_single_chunk():
+    data = b"id\n1\n2\n"
+    chunks = list(seed_helpers.iter_csv_chunks(BytesIO(data), chunk_size=1024))
+    assert chunks == [seed_helpers.CsvChunk(3, 7, data)]
+
+
+def test_iter_csv_chunks_header_only():
+    assert list(seed_helpers.iter_csv_chunks(BytesIO(b"id\n"), chunk_size=1)) == []
@@ -0,0 +1,145 @@
+from awardsreport.database import engine
+from awardsreport.models import (
+    ProcurementTransactions,
+    Transactions,
+    TransactionsWatermark,
+)
+from awardsreport.setup import seed_transactions_table, staging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy import column, delete, insert, select, table
+import time
+
+
+def insert_proc(conn, *rows):
+    conn.execute(
+        insert(ProcurementTransactions),
+        [
+            dict(
+                contract_transaction_unique_key=key,
+                action_date=date(2023, 1, 1),
+                last_modified_date=modified,
+                recipient_name=name,
+            )
+            for key, modified, name in rows
+        ],
+    )
+
+
+def get_tx(conn):
+    return conn.execute(
+        select(
+            Transactions.contract_transaction_unique_key,
+            Transactions.recipient_name,
+        ).order_by(Transactions.contract_transaction_unique_key)
+    ).all()
+
+
+def test_get_watermark_none(conn):
+    assert seed_transactions_table.get_watermark(conn, "missing") == 0
+
+
+def test_set_watermark(conn):
+    seed_transactions_table.set_watermark(conn, "procurement_transactions", 5)
+    seed_transactions_table.set_watermark(conn, "procurement_transactions", 9)
+    assert seed_transactions_table.get_watermark(conn, "procurement_transactions") == 9
+
+
+def test_merge_source(conn):
+    insert_proc(
+        conn,
+        ("C_1", date(2023, 1, 1), "a"),
+        ("C_2", date(2023, 1, 1), "b"),
+    )
+    result = seed_transactions_table.merge_source(conn, ProcurementTransactions)
+    assert result == (0, 2)
+    assert seed_transactions_table.merge_source(conn, ProcurementTransactions) == (
+        0,
+        0,
+    )
+
+    insert_proc(
+        conn,
+        ("C_1", date(2023, 2, 1), "a newest"),
+        ("C_1", date(2023, 1, 15), "a older"),
+        ("C_2", date(2023, 1, 1), "b unchanged"),
+        ("C_3", date(2023, 1, 1), "c"),
+    )
+    result = seed_transactions_table.merge_source(conn, ProcurementTransactions)
+    assert result == (1, 1)
+    assert [tuple(r) for r in get_tx(conn)] == [
+        ("C_1", "a newest"),
+        ("C_2", "b"),
+        ("C_3", "c"),
+    ]
+
+    # reloading an older archive does not overwrite newer transactions.
+    insert_proc(conn, ("C_1", date(2023, 1, 20), "a stale"))
+    result = seed_transactions_table.merge_source(conn, ProcurementTransactions)
+    assert result == (0, 0)
+    assert get_tx(conn)[0] == ("C_1", "a newest")
+
+
+def test_merge_source_after_staging_merge(conn):
+    insert_proc(conn, ("C_1", date(2023, 1, 1), "a"), ("C_2", date(2023, 1, 1), "b"))
+    assert seed_transactions_table.merge_source(conn, ProcurementTransactions) == (
+        0,
+        2,
+    )
+
+    # a delta load upserts the modified transaction into the raw table.
+    with staging.staging_table(
+        conn, ProcurementTransactions, staging.MergeCounts()
+    ) as name:
+        stg = table(
+            name,
+            column("contract_transaction_unique_key"),
+            column("action_date"),
+            column("last_modified_date"),
+            column("recipient_name"),
+        )
+        conn.execute(
+            insert(stg),
+            dict(
+                contract_transaction_unique_key="C_1",
+                action_date=date(2023, 1, 1),
+                last_modified_date=date(2023, 2, 1),
+                recipient_name="a modified",
+            ),
+        )
+
+    assert seed_transactions_table.merge_source(conn, ProcurementTransactions) == (
+        1,
+        0,
+    )
+    assert [tuple(r) for r in get_tx(conn)] == [("C_1", "a modified"), ("C_2", "b")]
+
+
+def test_merge_source_waits_for_uncommitted_loads():
+    try:
+        with engine.connect() as loading:
+            # a load holding a lower id commits after one holding a higher id.
+            staging.lock_raw_table(loading, ProcurementTransactions, shared=True)
+            insert_proc(loading, ("C_1", date(2023, 1, 1), "a"))
+            with engine.begin() as conn:
+                staging.lock_raw_table(conn, ProcurementTransactions, shared=True)
+                insert_proc(conn, ("C_2", date(2023, 1, 1), "b"))
+
+            def merge():
+                with engine.begin() as conn:
+                    return seed_transactions_table.merge_source(
+                        conn, ProcurementTransactions
+                    )
+
+            with ThreadPoolExecutor(1) as executor:
+                future = executor.submit(merge)
+                time.sleep(0.2)
+                assert not future.done()
+                loading.commit()
+                assert future.result(timeout=5) == (0, 2)
+        with engine.connect() as conn:
+            assert [tuple(r) for r in get_tx(conn)] == [("C_1", "a"), ("C_2", "b")]
+    finally:
+        with engine.begin() as conn:
+            for model in (Transactions, ProcurementTransactions, TransactionsWatermark):
+                conn.execute(delete(model))
@@ -0,0 +1,137 @@
+from awardsreport.models import AssistanceTransactions, ProcurementTransactions
+from awardsreport.setup import staging
+from datetime import date
+from sqlalchemy import insert, select, table, column
+
+
+def test_create_staging_table_sql():
+    result = staging.create_staging_table_sql(ProcurementTransactions, "stg")
+    assert result.startswith("CREATE UNLOGGED TABLE stg AS SELECT ")
+    assert result.endswith(" FROM procurement_transactions WITH NO DATA")
+
+
+def test_staging_table_generates_columns(conn):
+    with staging.staging_table(conn, AssistanceTransactions) as name:
+        stg = table(
+            name,
+            column("action_date"),
+            column("assistance_type_code"),
+            column("assistance_award_unique_key"),
+            column("federal_action_obligation"),
+            column("original_loan_subsidy_cost"),
+        )
+        conn.execute(
+            insert(stg),
+            [
+                dict(
+                    action_date=date(2023, 2, 1),
+                    assistance_type_code="07",
+                    assistance_award_unique_key="ASST_1",
+                    federal_action_obligation=5.0,
+                    original_loan_subsidy_cost=2.0,
+                ),
+                dict(
+                    action_date=date(2022, 11, 5),
+                    assistance_type_code="02",
+                    assistance_award_unique_key="ASST_2",
+                    federal_action_obligation=None,
+                    original_loan_subsidy_cost=None,
+                ),
+            ],
+        )
+
+    results = conn.execute(
+        select(
+            AssistanceTransactions.action_date_year,
+            AssistanceTransactions.action_date_year_month,
+            AssistanceTransactions.award_summary_unique_key,
+            AssistanceTransactions.generated_pragmatic_obligations,
+        ).order_by(AssistanceTransactions.action_date)
+    ).all()
+    assert [tuple(r) for r in results] == [
+        (2022, "2022-11", "ASST_2", 0.0),
+        (2023, "2023-02", "ASST_1", 2.0),
+    ]
+    assert conn.exec_driver_sql(f"select to_regclass('{name}')").scalar() is None
+
+
+def test_staging_table_fast_ingest(conn):
+    with staging.staging_table(conn, ProcurementTransactions):
+        assert conn.exec_driver_sql("show synchronous_commit").scalar() == "off"
+    conn.rollback()
+    assert conn.exec_driver_sql("show synchronous_commit").scalar() == "on"
+
+
+def test_staging_table_merge(conn):
+    conn.execute(
+        insert(ProcurementTransactions),
+        [
+            dict(
+                contract_transaction_unique_key=key,
+                action_date=date(2023, 1, 1),
+                last_modified_date=date(2023, 1, 1),
+                recipient_name="old",
+            )
+            for key in ("C_1", "C_2")
+        ],
+    )
+    counts = staging.MergeCounts()
+    with staging.staging_table(conn, ProcurementTransactions, counts) as name:
+        stg = table(
+            name,
+            column("contract_transaction_unique_key"),
+            column("action_date"),
+            column("last_modified_date"),
+            column("recipient_name"),
+        )
+        conn.execute(
+            insert(stg),
+            [
+                dict(
+                    contract_transaction_unique_key=key,
+                    action_date=date(2023, 1, 1),
+                    last_modified_date=modified,
+                    recipient_name=recipient,
+                )
+                for key, modified, recipient in (
+                    ("C_1", date(2023, 2, 1), "newer"),
+                    ("C_2", date(2023, 1, 1), "same"),
+                    ("C_3", date(2023, 1, 1), "older"),
+                    ("C_3", date(2023, 3, 1), "newest"),
+                    (None, date(2023, 1, 1), "no key"),
+                )
+            ],
+        )
+
+    assert counts == staging.MergeCounts(
+        inserted=2, updated=1, unchanged=1, duplicates=1
+    )
+    results = conn.execute(
+        select(
+            ProcurementTransactions.contract_transaction_unique_key,
+            ProcurementTransactions.recipient_name,
+        ).order_by(ProcurementTransactions.contract_transaction_unique_key)
+    ).all()
+    assert [tuple(r) for r in results] == [
+        ("C_1", "newer"),
+        ("C_2", "old"),
+        ("C_3", "newest"),
+        (None, "no key"),
+    ]
+
+
+def test_staging_table_merge_creates_partitions(conn):
+    with staging.staging_table(
+        conn, ProcurementTransactions, staging.MergeCounts()
+    ) as name:
+        stg = table(
+            name, column("contract_transaction_unique_key"), column("action_date")
+        )
+        conn.execute(
+            insert(stg),
+            dict(contract_transaction_unique_key="C_1", action_date=date(1998, 6, 1)),
+        )
+
+    assert conn.execute(
+        select(ProcurementTransactions.action_date)
+    ).scalars().all() == [date(1998, 6, 1)]
@@ -0,0 +1,60 @@
+from awardsreport.setup import partitions, table_swap
+from sqlalchemy import text
+import pytest
+
+
+@pytest.fixture
+def conn(conn):
+    conn.execute(
+        text(
+            "CREATE TABLE swap_test (id serial PRIMARY KEY, k text, v int);"
+            "CREATE INDEX ix_swap_test_k ON swap_test (k);"
+            "INSERT INTO swap_test (k, v) VALUES ('old', 1);"
+        )
+    )
+    return conn
+
+
+def test_shadow_name():
+    assert table_swap.shadow_name("transactions") == "transactions_shadow"
+    assert len(table_swap.shadow_name("t" * 63)) == 63
+
+
+def test_swap_tables(conn):
+    shadow = table_swap.create_shadow_table(conn, "swap_test")
+    conn.execute(text(f"INSERT INTO {shadow} (k, v) VALUES ('new', 2)"))
+    table_swap.build_shadow_indexes(conn, "swap_test", shadow)
+    old = table_swap.swap_tables(conn, "swap_test", shadow)
+    table_swap.drop_old_table(conn, old)
+
+    assert conn.execute(text("SELECT id, k FROM swap_test")).all() == [(2, "new")]
+    assert table_swap.get_constraint_ddl(conn, "swap_test") == {
+        "swap_test_pkey": "PRIMARY KEY (id)"
+    }
+    assert list(table_swap.get_index_ddl(conn, "swap_test")) == ["ix_swap_test_k"]
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence('swap_test', 'id')")
+    ).scalar()
+    assert sequence == "public.swap_test_id_seq"
+
+
+def test_swap_partitioned_tables(conn):
+    conn.execute(
+        text(
+            "CREATE TABLE swap_part (id serial, action_date date, "
+            "PRIMARY KEY (action_date, id)) PARTITION BY RANGE (action_date);"
+            "CREATE TABLE swap_part_y2023 PARTITION OF swap_part "
+            "FOR VALUES FROM ('2023-01-01') TO ('2024-01-01');"
+        )
+    )
+    shadow = table_swap.create_shadow_table(conn, "swap_part")
+    partitions.ensure_partitions(conn, shadow, [2023])
+    conn.execute(text(f"INSERT INTO {shadow} (action_date) VALUES ('2023-05-01')"))
+    table_swap.build_shadow_indexes(conn, "swap_part", shadow)
+    old = table_swap.swap_tables(conn, "swap_part", shadow)
+    table_swap.drop_old_table(conn, old)
+
+    assert partitions.get_partitions(conn, "swap_part") == ["swap_part_y2023"]
+    assert table_swap.get_constraint_ddl(conn, "swap_part_y2023") == {
+        "swap_part_y2023_pkey": "PRIMARY KEY (action_date, id)"
+    }